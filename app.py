@@ -1,14 +1,14 @@
-import sqlite3
-import psycopg2
-from urllib.parse import urlparse
+import logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')  # Surface database/seed logs in the console
+
 from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for, flash
-from database import DatabaseManager
-from models import create_user, get_user_by_username_or_email, verify_user_email, hash_password, init_auth_db, get_auth_db_connection
+from database import DatabaseManager, DOCUMENTS_PAGE_SIZE, SEARCH_PAGE_SIZE, SEARCH_RESULT_FIELDS
+from models import (create_user, get_user_by_username_or_email, get_user_by_verification_token, verify_user_email,
+                    complete_signup, set_user_password, hash_password, verify_password, password_needs_rehash, generate_verification_code,
+                    init_auth_db, get_auth_db_connection, USE_POSTGRESQL)
 from nlp_processor import NLPProcessor
 import traceback
-import hashlib
-import secrets
-from datetime import datetime, timedelta
+from datetime import timedelta
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -68,6 +68,13 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 db_manager = DatabaseManager()
 nlp_processor = NLPProcessor()
 
+# Upper bound on client-requested page sizes for the document and search APIs
+MAX_PAGE_SIZE = 100
+
+def parse_page_size(value, default):
+    """Client page size clamped to 1..MAX_PAGE_SIZE; raises ValueError/TypeError if malformed"""
+    return max(1, min(int(default if value is None else value), MAX_PAGE_SIZE))
+
 # Email configuration from environment variables
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
@@ -90,70 +97,6 @@ elif USE_SMTP:
 else:
     print("⚠️  Email service not configured - using console fallback")
 
-# ✅ CRITICAL FIX: Universal database connection function
-def get_auth_db_connection():
-    """Get connection to authentication database (PostgreSQL on Render, SQLite locally)"""
-    database_url = os.environ.get('DATABASE_URL')
-    
-    # Handle Render's PostgreSQL URL
-    if database_url and database_url.startswith('postgres://'):
-        database_url = database_url.replace('postgres://', 'postgresql://', 1)
-    
-    if database_url and database_url.startswith('postgresql://'):
-        try:
-            # PostgreSQL connection (Render Production)
-            result = urlparse(database_url)
-            conn = psycopg2.connect(
-                database=result.path[1:],
-                user=result.username,
-                password=result.password,
-                host=result.hostname,
-                port=result.port
-            )
-            print("✅ Connected to PostgreSQL database")
-            return conn
-        except Exception as e:
-            print(f"❌ PostgreSQL connection failed: {e}, falling back to SQLite")
-            # Fallback to SQLite
-            return get_sqlite_connection()
-    else:
-        # SQLite connection (Local Development)
-        return get_sqlite_connection()
-
-def get_sqlite_connection():
-    """Get SQLite connection for development"""
-    conn = sqlite3.connect('users.db')
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def get_main_db_connection():
-    """Get connection for main documents database"""
-    database_url = os.environ.get('DATABASE_URL')
-    
-    if database_url and database_url.startswith('postgres://'):
-        database_url = database_url.replace('postgres://', 'postgresql://', 1)
-    
-    if database_url and database_url.startswith('postgresql://'):
-        try:
-            # PostgreSQL for main database
-            result = urlparse(database_url)
-            conn = psycopg2.connect(
-                database=result.path[1:],
-                user=result.username,
-                password=result.password,
-                host=result.hostname,
-                port=result.port
-            )
-            return conn
-        except Exception as e:
-            print(f"❌ PostgreSQL connection error: {e}")
-            return sqlite3.connect('shiksha_setu.db')
-    else:
-        # SQLite for development
-        return sqlite3.connect('shiksha_setu.db')
-
-
-
 # ✅ CRITICAL FIX: Universal database execution helper
 def execute_db_query(query, params=(), fetchone=False, fetchall=False, commit=False):
     """Execute database queries that work with both SQLite and PostgreSQL"""
@@ -162,7 +105,7 @@ def execute_db_query(query, params=(), fetchone=False, fetchall=False, commit=Fa
         cursor = conn.cursor()
         
         # Convert SQLite ? placeholders to PostgreSQL %s if needed
-        if hasattr(conn, 'cursor') and not isinstance(conn, sqlite3.Connection):
+        if USE_POSTGRESQL:
             # PostgreSQL - convert ? to %s
             query = query.replace('?', '%s')
         
@@ -590,33 +533,14 @@ def register():
             return render_template('register.html', username=username, email=email)
         
         # Generate simpler verification code (6-digit number)
-        verification_code = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
-        token_expiry = datetime.now() + timedelta(hours=24)
+        verification_code = generate_verification_code()
         
         print(f"Generated verification code: {verification_code} for {email}")
         
-        # Store user data (without password yet)
+        # Store user data (without password yet); the id comes back from the INSERT itself
         try:
-            # Use the universal database function
-            user_id = execute_db_query(
-                'INSERT INTO users (username, email, verification_token, token_expiry) VALUES (?, ?, ?, ?) RETURNING id',
-                (username, email, verification_code, token_expiry),
-                fetchone=True,
-                commit=True
-            )
-            
-            if user_id:
-                if isinstance(user_id, dict) and 'id' in user_id:
-                    user_id = user_id['id']
-                print(f"User stored in database with ID: {user_id}")
-            else:
-                # Fallback for SQLite
-                conn = get_auth_db_connection()
-                cursor = conn.cursor()
-                cursor.execute('SELECT last_insert_rowid()')
-                user_id = cursor.fetchone()[0]
-                conn.close()
-                print(f"User stored in SQLite with ID: {user_id}")
+            user_id = create_user(username, email, verification_code)
+            print(f"User stored in database with ID: {user_id}")
             
         except Exception as db_error:
             print(f"Database error: {db_error}")
@@ -654,11 +578,7 @@ def verify_email(token=None):
     
     if request.method == 'GET' and token:
         # Handle direct link verification
-        user = execute_db_query(
-            'SELECT * FROM users WHERE verification_token = ? AND token_expiry > ?',
-            (token, datetime.now()),
-            fetchone=True
-        )
+        user = get_user_by_verification_token(token)
         
         if user:
             session['verified_user'] = user['id']
@@ -694,11 +614,7 @@ def verify_email(token=None):
             session['verified_email'] = session.get('pending_email')
             
             # Update database
-            execute_db_query(
-                'UPDATE users SET email_verified = TRUE WHERE id = ?',
-                (user_id,),
-                commit=True
-            )
+            verify_user_email(user_id)
             
             # Clear pending session data
             session.pop('pending_user_id', None)
@@ -740,15 +656,12 @@ def create_password():
             return render_template('create_password.html')
         
         # Hash password
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        password_hash = hash_password(password)
         
-        # Update user with password
+        # Save the password and mark the email verified in one statement
         try:
-            execute_db_query(
-                'UPDATE users SET password_hash = ?, email_verified = TRUE WHERE id = ?',
-                (password_hash, session['verified_user']),
-                commit=True
-            )
+            if not complete_signup(session['verified_user'], password_hash):
+                raise RuntimeError('Could not save the new password')
             
             # Get user info for session
             user = execute_db_query(
@@ -793,15 +706,16 @@ def login():
             flash('Please fill in all fields', 'error')
             return render_template('login.html')
         
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        user = execute_db_query(
-            'SELECT * FROM users WHERE (username = ? OR email = ?) AND password_hash = ? AND email_verified = TRUE',
-            (username_or_email, username_or_email, password_hash),
-            fetchone=True
-        )
+        # Salted hashes can't be matched in SQL, so load the user and verify here
+        user = get_user_by_username_or_email(username_or_email)
+        if user and not (user['email_verified'] and verify_password(password, user['password_hash'])):
+            user = None
         
         if user:
+            if password_needs_rehash(user['password_hash']):
+                # Upgrade legacy SHA-256 hashes now that we have the plaintext
+                set_user_password(user['id'], hash_password(password))
+            
             # ✅ CRITICAL FIX: Set permanent session
             session['user_id'] = user['id']
             session['username'] = user['username']
@@ -853,9 +767,7 @@ def debug_users():
 @app.route('/debug/database-type')
 def debug_database_type():
     """Check which database is being used"""
-    conn = get_auth_db_connection()
-    db_type = "PostgreSQL" if hasattr(conn, 'cursor') and not isinstance(conn, sqlite3.Connection) else "SQLite"
-    conn.close()
+    db_type = "PostgreSQL" if USE_POSTGRESQL else "SQLite"
     return jsonify({'database_type': db_type})
 
 # Existing Application Routes (keep all your existing routes below exactly as they are)
@@ -889,6 +801,11 @@ def search_documents():
         query = data.get('query', '')
         doc_type = data.get('document_type', '')
         category = data.get('category', '')
+        try:
+            limit = parse_page_size(data.get('limit'), SEARCH_PAGE_SIZE)
+            offset = max(int(data.get('offset', 0)), 0)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'limit and offset must be integers'}), 400
         
         print(f"Search parameters - query: '{query}', type: '{doc_type}', category: '{category}'")
         
@@ -897,8 +814,13 @@ def search_documents():
         basic_results = db_manager.search_documents(
             query=query if query else None,
             doc_type=doc_type if doc_type else None,
-            category=category if category else None
+            category=category if category else None,
+            # One extra row tells us whether another page follows
+            limit=limit + 1,
+            offset=offset
         )
+        has_more = len(basic_results) > limit
+        basic_results = basic_results[:limit]
         print(f"Basic search found {len(basic_results)} results")
         
         # Semantic search if query is provided
@@ -913,6 +835,19 @@ def search_documents():
                 print(f"Semantic search traceback: {traceback.format_exc()}")
                 # Continue with basic results only
         
+        # Semantic hits are copies of full corpus rows; trim them to the basic-search shape so
+        # every result has the same fields and full_text_content stays on the document page
+        semantic_fields = SEARCH_RESULT_FIELDS + ('similarity_score',)
+        semantic_results = [{field: result[field] for field in semantic_fields if field in result}
+                            for result in semantic_results]
+        
+        if offset:
+            # Semantic hits are merged into the first page only; later pages skip them so
+            # the same documents don't repeat on every page
+            semantic_ids = {result['id'] for result in semantic_results}
+            basic_results = [result for result in basic_results if result['id'] not in semantic_ids]
+            semantic_results = []
+        
         # Combine and deduplicate results
         all_results = basic_results + semantic_results
         unique_results = {}
@@ -938,7 +873,9 @@ def search_documents():
         return jsonify({
             'success': True,
             'results': final_results,
-            'count': len(final_results)
+            'count': len(final_results),
+            # Pass back as offset to fetch the next page; None when this is the last one
+            'next_offset': offset + limit if has_more else None
         })
         
     except Exception as e:
@@ -959,10 +896,21 @@ def get_all_documents_api():
         return jsonify({'success': False, 'error': 'Authentication required'}), 401
         
     try:
-        documents = db_manager.get_all_documents()
+        try:
+            limit = parse_page_size(request.args.get('limit'), DOCUMENTS_PAGE_SIZE)
+            # The cursor is the "search_priority,id" pair returned as next_cursor by the previous page
+            cursor = request.args.get('cursor')
+            cursor = tuple(int(part) for part in cursor.split(',')) if cursor else None
+            if cursor is not None and len(cursor) != 2:
+                raise ValueError('cursor must be two integers')
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid limit or cursor'}), 400
+        
+        page = db_manager.get_documents_page(limit=limit, cursor=cursor)
         return jsonify({
             'success': True,
-            'documents': documents
+            'documents': page['rows'],
+            'next_cursor': ','.join(map(str, page['next_cursor'])) if page['next_cursor'] else None
         })
     except Exception as e:
         return jsonify({
@@ -978,30 +926,10 @@ def document_detail(document_id):
         return redirect(url_for('login', next=url_for('document_detail', document_id=document_id)))
         
     try:
-        # Get the specific document
-        conn = get_main_db_connection()
-        cursor = conn.cursor()
-        
-        if hasattr(conn, 'cursor') and not isinstance(conn, sqlite3.Connection):
-            # PostgreSQL
-            cursor.execute("SELECT * FROM documents WHERE id = %s", (document_id,))
-        else:
-            # SQLite
-            cursor.execute("SELECT * FROM documents WHERE id = ?", (document_id,))
-            
-        document_data = cursor.fetchone()
-        conn.close()
+        # Get the specific document (served from db_manager's cache on repeat views)
+        document = db_manager.get_document_by_id(document_id)
         
-        if document_data:
-            # Convert to dictionary
-            if hasattr(cursor, 'description'):
-                # PostgreSQL
-                columns = [desc[0] for desc in cursor.description]
-                document = dict(zip(columns, document_data))
-            else:
-                # SQLite
-                columns = ['id', 'title', 'content', 'document_type', 'category', 'department', 'created_date', 'keywords', 'document_url']
-                document = dict(zip(columns, document_data))
+        if document:
             return render_template('document_detail.html', document=document)
         else:
             return "Document not found", 404
@@ -1016,24 +944,9 @@ def get_document_api(document_id):
         return jsonify({'success': False, 'error': 'Authentication required'}), 401
         
     try:
-        conn = get_main_db_connection()
-        cursor = conn.cursor()
+        document = db_manager.get_document_by_id(document_id)
         
-        if hasattr(conn, 'cursor') and not isinstance(conn, sqlite3.Connection):
-            cursor.execute("SELECT * FROM documents WHERE id = %s", (document_id,))
-        else:
-            cursor.execute("SELECT * FROM documents WHERE id = ?", (document_id,))
-            
-        document_data = cursor.fetchone()
-        conn.close()
-        
-        if document_data:
-            if hasattr(cursor, 'description'):
-                columns = [desc[0] for desc in cursor.description]
-                document = dict(zip(columns, document_data))
-            else:
-                columns = ['id', 'title', 'content', 'document_type', 'category', 'department', 'created_date', 'keywords', 'document_url']
-                document = dict(zip(columns, document_data))
+        if document:
             return jsonify({'success': True, 'document': document})
         else:
             return jsonify({'success': False, 'error': 'Document not found'}), 404
@@ -1,7 +1,26 @@
 import os
-import pandas as pd
-from datetime import datetime
-import sys
+import re
+import io
+import json
+import hashlib
+import itertools
+import weakref
+import struct
+import time
+import logging
+import threading
+import queue
+import functools
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from datetime import date
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; init is then only serialized per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 # Database configuration - automatically switches between SQLite and PostgreSQL
 USE_POSTGRESQL = os.environ.get('DATABASE_URL') is not None
@@ -9,173 +28,873 @@ USE_POSTGRESQL = os.environ.get('DATABASE_URL') is not None
 if USE_POSTGRESQL:
     import psycopg2
     from psycopg2.extras import RealDictCursor
-    print("🔗 Using PostgreSQL database")
+    from psycopg2.pool import ThreadedConnectionPool
+    logger.info("🔗 Using PostgreSQL database")
 else:
     import sqlite3
-    print("🔗 Using SQLite database")
+    logger.info("🔗 Using SQLite database")
+
+PLACEHOLDER = '%s' if USE_POSTGRESQL else '?'
+
+# Column order used when seeding documents, and the binary wire types for the PostgreSQL COPY
+DOCUMENT_COLUMNS = (
+    'title', 'content', 'document_type', 'category', 'sub_category', 'department',
+    'created_date', 'last_updated', 'status', 'jurisdiction', 'keywords',
+    'document_url', 'search_priority', 'full_text_content'
+)
+DOCUMENT_COPY_TYPES = (
+    'text', 'text', 'text', 'text', 'text', 'text',
+    'date', 'date', 'text', 'text', 'text',
+    'text', 'int4', 'text'
+)
+
+# Columns added to documents after the original schema, applied by the SQLite migration
+MIGRATION_COLUMNS = (
+    ('sub_category', 'TEXT'),
+    ('last_updated', 'DATE'),
+    ('status', "TEXT DEFAULT 'Active'"),
+    ('jurisdiction', 'TEXT'),
+    ('search_priority', 'INTEGER NOT NULL DEFAULT 1'),
+    ('full_text_content', 'TEXT')
+)
+
+# Seed SQL is built once at import time and reused for every batch
+def _build_insert_sql(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([PLACEHOLDER] * len(columns))})"
+
+INSERT_DOCUMENT_SQL = _build_insert_sql('documents', DOCUMENT_COLUMNS)
+INSERT_KEYWORD_SQL = _build_insert_sql('document_keywords', ('document_id', 'keyword', 'relevance_score'))
+# PostgreSQL: every keyword row in one statement, passed as two parallel arrays
+INSERT_KEYWORDS_UNNEST_SQL = (
+    "INSERT INTO document_keywords (document_id, keyword, relevance_score) "
+    "SELECT document_id, keyword, 1 FROM unnest(%s::int[], %s::text[]) AS k(document_id, keyword)"
+)
+
+# Columns returned to callers; spelled out so backend-only columns (e.g. search_vector) stay internal
+DOCUMENT_FIELDS = ('id',) + DOCUMENT_COLUMNS + ('created_at',)
+DOCUMENT_SELECT_LIST = ', '.join(DOCUMENT_FIELDS)
+DOCUMENT_SELECT_LIST_D = ', '.join(f'd.{field}' for field in DOCUMENT_FIELDS)
+# Search hits feed list views and the JSON API; the long full_text_content body is left to
+# get_document_by_id so it isn't copied out of the database for every hit
+SEARCH_RESULT_FIELDS = tuple(field for field in DOCUMENT_FIELDS if field != 'full_text_content')
+SEARCH_SELECT_LIST = ', '.join(SEARCH_RESULT_FIELDS)
+SEARCH_SELECT_LIST_D = ', '.join(f'd.{field}' for field in SEARCH_RESULT_FIELDS)
+
+# Fields read back after seeding documents, used to build the keyword and search index rows
+SEEDED_DOCUMENT_FIELDS = ('id', 'title', 'keywords')
+SELECT_SEEDED_DOCUMENTS_SQL = f"SELECT {', '.join(SEEDED_DOCUMENT_FIELDS)} FROM documents ORDER BY id"
+
+# Keeps a multi-row SQLite INSERT under the 999 bound-variable limit of older builds
+SQLITE_INSERT_BATCH_ROWS = 999 // len(DOCUMENT_COLUMNS)
+
+# The built-in higher education corpus, one tuple per document in DOCUMENT_COLUMNS order
+SEED_DOCUMENT_ROWS = (
+    # Policy Documents
+    (
+        'National Education Policy 2020 - Complete Document',
+        'The National Education Policy 2020 is a comprehensive framework for elementary to higher education in India. It focuses on multidisciplinary education, flexibility in learning, internationalization of education, and promoting Indian languages and culture.',
+        'Policy Document',
+        'National Policy',
+        'Higher Education Reform',
+        'Ministry of Education',
+        '2020-07-29',
+        '2020-07-29',
+        'Active',
+        'National',
+        'NEP 2020,education policy,India,higher education,school education,multidisciplinary,internationalization,academic bank of credits,multiple entry exit,regulation framework,curriculum reform,assessment reform',
+        'https://www.education.gov.in/sites/upload_files/mhrd/files/NEP_Final_English_0.pdf',
+        5,
+        'National Education Policy 2020 NEP comprehensive framework elementary to higher education India multidisciplinary education flexibility learning internationalization promoting Indian languages culture academic bank of credits multiple entry exit regulatory framework higher education commission',
+    ),
+    (
+        'National Policy on Skill Development and Entrepreneurship 2015',
+        'Policy framework to rapidly scale up skill development efforts in India and link them to employment opportunities.',
+        'Policy Document',
+        'Skill Development',
+        'Entrepreneurship',
+        'Ministry of Skill Development',
+        '2015-07-15',
+        '2015-07-15',
+        'Active',
+        'National',
+        'skill development,entrepreneurship,vocational training,employment,NSDC,skill India',
+        'https://www.skilldevelopment.gov.in/national-policy.html',
+        4,
+        'National Policy Skill Development Entrepreneurship framework scale up skill development India link employment opportunities vocational training NSDC Skill India',
+    ),
+    # Regulations
+    (
+        'University Grants Commission Regulations 2023',
+        'Latest UGC regulations governing higher education institutions, including accreditation standards, faculty qualifications, and institutional governance.',
+        'Regulation',
+        'Higher Education',
+        'Accreditation Standards',
+        'University Grants Commission',
+        '2023-01-15',
+        '2023-01-15',
+        'Active',
+        'National',
+        'UGC,regulations,accreditation,quality standards,faculty qualifications,governance,higher education institutions,universities,colleges,compliance,approval process',
+        'https://www.ugc.gov.in/regulations/',
+        5,
+        'University Grants Commission UGC regulations governing higher education institutions accreditation standards faculty qualifications institutional governance quality assurance compliance requirements universities colleges approval process',
+    ),
+    (
+        'AICTE Approval Process Handbook 2023-24',
+        'Comprehensive handbook detailing the approval process for technical institutions and programs in India.',
+        'Regulation',
+        'Technical Education',
+        'Approval Process',
+        'AICTE',
+        '2023-03-01',
+        '2023-03-01',
+        'Active',
+        'National',
+        'AICTE,technical education,engineering,management,pharmacy,architecture,approval process,quality standards,inspection,norms,program approval',
+        'https://www.aicte-india.org/approval-process',
+        5,
+        'AICTE Approval Process Handbook technical institutions programs India engineering management pharmacy architecture quality standards inspection norms program approval',
+    ),
+    # Schemes & Programs
+    (
+        'Scholarship Schemes for Higher Education 2023-24',
+        'Comprehensive guide to various scholarship schemes available for students in higher education including merit-based and means-based scholarships.',
+        'Scheme',
+        'Student Financial Aid',
+        'Scholarships',
+        'Ministry of Education',
+        '2023-04-01',
+        '2023-04-01',
+        'Active',
+        'National',
+        'scholarship,financial aid,merit-based,means-based,SC ST OBC,minority scholarships,post-matric,National Scholarship Portal,student aid,fee reimbursement',
+        'https://scholarships.gov.in/',
+        5,
+        'Scholarship schemes higher education students merit-based means-based SC ST OBC minority post-matric National Scholarship Portal financial aid support eligibility criteria application process fee reimbursement',
+    ),
+    # Guidelines
+    (
+        'Online Education Guidelines and Standards 2023',
+        'Comprehensive guidelines for online and distance learning programs in higher education institutions.',
+        'Guidelines',
+        'Digital Education',
+        'Online Learning',
+        'University Grants Commission',
+        '2023-02-15',
+        '2023-02-15',
+        'Active',
+        'National',
+        'online education,distance learning,digital education,MOOCs,SWAYAM,learning management system,quality standards,virtual learning,blended learning',
+        'https://www.ugc.gov.in/online-guidelines',
+        4,
+        'Online education guidelines standards distance learning programs higher education institutions MOOCs SWAYAM learning management system quality assurance digital infrastructure virtual learning blended learning',
+    ),
+    # Frameworks & Standards
+    (
+        'National Institutional Ranking Framework Methodology 2023',
+        'Detailed methodology for NIRF ranking of higher education institutions including parameters for teaching, research, and graduation outcomes.',
+        'Framework',
+        'Institutional Ranking',
+        'Ranking Methodology',
+        'Ministry of Education',
+        '2023-02-10',
+        '2023-02-10',
+        'Active',
+        'National',
+        'NIRF,ranking,higher education institutions,methodology,parameters,teaching quality,research,graduation outcomes,academic reputation,institutional ranking',
+        'https://www.nirfindia.org/methodology',
+        4,
+        'National Institutional Ranking Framework NIRF methodology ranking higher education institutions parameters teaching learning resources research professional practice graduation outcomes outreach inclusivity perception',
+    ),
+    # Reports & Statistics
+    (
+        'All India Survey on Higher Education 2021-22',
+        'Comprehensive survey providing key performance indicators on higher education in India including enrollment, institutions, and teachers.',
+        'Survey Report',
+        'Education Statistics',
+        'Higher Education Data',
+        'Ministry of Education',
+        '2023-01-10',
+        '2023-01-10',
+        'Active',
+        'National',
+        'AISHE,higher education,enrollment,universities,colleges,education statistics,performance indicators,institutional data',
+        'https://www.education.gov.in/sites/upload_files/mhrd/files/statistics-new/aishe_2021-22.pdf',
+        4,
+        'All India Survey Higher Education AISHE key performance indicators enrollment institutions teachers universities colleges education statistics institutional data',
+    ),
+)
+
+# Matches the ORDER BY of get_all_documents, so listing reads rows in index order
+# instead of sorting the whole table
+CREATE_PRIORITY_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_documents_search_priority_id '
+    'ON documents (search_priority DESC, id DESC)'
+)
+
+# Keyword searches take the whole keyword list as one parameter (a JSON array on SQLite,
+# a text[] on PostgreSQL), so the SQL text is the same however many keywords are passed
+# Match counts are grouped off the covering keyword index first, so only matching
+# documents are read and no full document rows pass through the GROUP BY
+KEYWORD_SEARCH_SQLITE_SQL = f'''
+    WITH matches AS (
+        SELECT document_id, COUNT(*) AS keyword_matches
+        FROM document_keywords
+        WHERE keyword IN (SELECT value FROM json_each(?))
+        GROUP BY document_id
+    )
+    SELECT {DOCUMENT_SELECT_LIST_D}, matches.keyword_matches
+    FROM matches
+    JOIN documents d ON d.id = matches.document_id
+    ORDER BY matches.keyword_matches DESC, d.search_priority DESC
+'''
+KEYWORD_SEARCH_POSTGRESQL_SQL = f'''
+    SELECT {DOCUMENT_SELECT_LIST_D},
+           cardinality(ARRAY(SELECT unnest(d.keyword_tags) INTERSECT SELECT unnest(%s::text[]))) as keyword_matches
+    FROM documents d
+    WHERE d.keyword_tags && %s::text[]
+    ORDER BY keyword_matches DESC, d.search_priority DESC
+'''
+
+# Rows per network fetch when streaming documents from a PostgreSQL server-side cursor
+STREAM_BATCH_ROWS = 500
+
+# Default page sizes for document listing and search results
+DOCUMENTS_PAGE_SIZE = 50
+SEARCH_PAGE_SIZE = 50
+
+# Recent search results and documents kept per DatabaseManager; cleared on any write
+SEARCH_CACHE_SIZE = 256
+DOCUMENT_CACHE_SIZE = 4096
+
+# (keyword, document_id) answers keyword_search's lookup and join from the index alone;
+# (document_id, keyword) serves per-document reads and foreign-key checks on documents
+KEYWORD_INDEXES_SQL = '''
+    DROP INDEX IF EXISTS idx_keywords_keyword;
+    CREATE INDEX IF NOT EXISTS idx_keywords_keyword_doc ON document_keywords(keyword, document_id);
+    CREATE INDEX IF NOT EXISTS idx_keywords_doc ON document_keywords(document_id, keyword);
+'''
+
+# Filter columns listed in the UI, mapped to their get_taxonomies() keys
+TAXONOMY_FIELDS = {
+    'category': 'categories',
+    'document_type': 'document_types',
+    'department': 'departments',
+    'sub_category': 'sub_categories',
+}
+# One round-trip for all four lists; UNION also de-duplicates each column's values
+SELECT_TAXONOMIES_SQL = ' UNION '.join(
+    f"SELECT '{column}' AS field, {column} AS value FROM documents WHERE {column} IS NOT NULL"
+    for column in TAXONOMY_FIELDS
+) + ' ORDER BY field, value'
+TAXONOMY_CACHE_TTL_SECONDS = 60
+
+# Idle SQLite connections kept per DatabaseManager
+SQLITE_POOL_SIZE = 8
+
+# Bounds for the per-process PostgreSQL connection pool
+PG_POOL_MIN_CONNECTIONS = 2
+PG_POOL_MAX_CONNECTIONS = 25
+
+# Arbitrary application-wide key for the PostgreSQL schema-init advisory lock
+INIT_ADVISORY_LOCK_ID = 7_240_311
+
+PGCOPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+PG_EPOCH_DATE = date(2000, 1, 1)
+
+def _encode_pg_binary_field(value, column_type):
+    """Encode a single value as a length-prefixed PostgreSQL binary COPY field"""
+    if value is None:
+        return struct.pack('!i', -1)
+    if column_type == 'int4':
+        payload = struct.pack('!i', int(value))
+    elif column_type == 'date':
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        payload = struct.pack('!i', (value - PG_EPOCH_DATE).days)
+    else:
+        payload = str(value).encode('utf-8')
+    return struct.pack('!i', len(payload)) + payload
+
+def _build_pg_binary_copy_buffer(rows, column_types):
+    """Serialize rows into one PostgreSQL binary COPY buffer (header, tuples, trailer)"""
+    buf = io.BytesIO()
+    buf.write(PGCOPY_SIGNATURE)
+    buf.write(struct.pack('!ii', 0, 0))  # flags, header extension length
+    field_count = struct.pack('!h', len(column_types))
+    for row in rows:
+        buf.write(field_count)
+        for value, column_type in zip(row, column_types):
+            buf.write(_encode_pg_binary_field(value, column_type))
+    buf.write(struct.pack('!h', -1))
+    buf.seek(0)
+    return buf
+
+def _to_pg_positional_params(query):
+    """Rewrite psycopg2 %s placeholders as the $1, $2, ... form PREPARE expects"""
+    counter = itertools.count(1)
+    return re.sub(r'%([s%])', lambda m: f'${next(counter)}' if m.group(1) == 's' else '%', query)
+
+def _split_keywords(keywords):
+    """Split a comma-separated keyword string into trimmed, lowercased keywords
+    
+    document_keywords and keyword_tags store this form, so keyword matching is case-insensitive.
+    """
+    return [keyword.strip().lower() for keyword in keywords.split(',') if keyword.strip()]
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_search_query(query):
+    """Canonical form of a search string, so repeat searches share a cache entry
+    
+    Every search path is case-insensitive already, so lowercasing never changes results.
+    """
+    return ' '.join(query.lower().split())
+
+def _probe_sqlite_fts5():
+    """Check whether the linked SQLite library was built with FTS5"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        try:
+            conn.execute('CREATE VIRTUAL TABLE fts5_probe USING fts5(body)')
+        finally:
+            conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+SQLITE_HAS_FTS5 = not USE_POSTGRESQL and _probe_sqlite_fts5()
+# The trigram tokenizer (SQLite 3.34+) indexes every 3-character window, so substring searches
+# that LIKE '%...%' would answer with a full scan can be served from an index instead
+SQLITE_HAS_FTS5_TRIGRAM = SQLITE_HAS_FTS5 and sqlite3.sqlite_version_info >= (3, 34, 0)
+TRIGRAM_MIN_QUERY_LENGTH = 3
+# Connection-scoped settings, so they are applied to every connection we open:
+# NORMAL sync is safe under WAL, temp tables stay in RAM, and a 64 MB page cache
+# plus 256 MB of memory-mapped I/O keep search reads off the filesystem
+SQLITE_CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA foreign_keys=ON',
+)
+
+# AS MATERIALIZED (SQLite 3.35+) stops the planner from flattening a CTE into the outer query
+SQLITE_CTE_MATERIALIZED = 'MATERIALIZED' if not USE_POSTGRESQL and sqlite3.sqlite_version_info >= (3, 35, 0) else ''
+
+# Stamped into PRAGMA user_version once the bootstrap has brought a file fully up to date;
+# bump it whenever the SQLite schema, indexes or FTS setup change so older files migrate again
+SQLITE_SCHEMA_VERSION = 5
+# PostgreSQL counterpart, kept in the one-row schema_meta table; one-time data migrations
+# run only while the stored version is below this
+PG_SCHEMA_VERSION = 1
+
+# Python's sqlite3 keeps prepared statements per connection keyed by SQL text; the default of 128
+# is easily crowded out by the filter combinations the search builds, so keep more of them around
+SQLITE_CACHED_STATEMENTS = 256
+
+# Base tables for a SQLite file, run as one script; column changes for older files go through
+# _migrate_database. Full-text search runs off documents_fts, so the old search_index is dropped
+SQLITE_SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        document_type TEXT NOT NULL,
+        category TEXT,
+        sub_category TEXT,
+        department TEXT,
+        created_date DATE,
+        last_updated DATE,
+        status TEXT DEFAULT 'Active',
+        jurisdiction TEXT,
+        keywords TEXT,
+        document_url TEXT,
+        search_priority INTEGER NOT NULL DEFAULT 1,
+        full_text_content TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS document_keywords (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER,
+        keyword TEXT NOT NULL,
+        keyword_type TEXT,
+        relevance_score INTEGER DEFAULT 1,
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    );
+    DROP TABLE IF EXISTS search_index;
+'''
+
+# bm25 weights per documents_fts column (title, content, keywords, full_text_content),
+# stored once as the table's rank function so queries read the built-in rank column
+FTS_RANK_FUNCTION = 'bm25(5.0, 2.0, 3.0, 1.0)'
+
+# The MATCH runs alone in a materialized CTE so the filters joined on afterwards
+# can't pull the planner off the FTS5 index. rank is negative bm25 (lower is better)
+SEARCH_FTS_SQLITE_SQL = f'''
+    WITH matches AS {SQLITE_CTE_MATERIALIZED} (
+        SELECT rowid, rank AS score
+        FROM documents_fts
+        WHERE documents_fts MATCH ?
+    )
+    SELECT {SEARCH_SELECT_LIST_D},
+           -matches.score * d.search_priority as relevance
+    FROM matches
+    JOIN documents d ON d.id = matches.rowid
+    WHERE 1=1
+'''
+
+# Substring filter for the basic search, answered by the documents_tg trigram index
+SEARCH_TRIGRAM_FILTER_SQL = " AND id IN (SELECT rowid FROM documents_tg WHERE documents_tg MATCH ?)"
+
+FTS5_TOKEN_RE = re.compile(r'\w+')
+
+def _fts5_match_query(query):
+    """Turn free text into an FTS5 MATCH expression: every word, as a quoted prefix term"""
+    tokens = FTS5_TOKEN_RE.findall(query)
+    return ' '.join(f'"{token}"*' for token in tokens)
 
 class DatabaseManager:
+    # Databases already initialized by this process; later instances skip init entirely
+    _initialized_targets = set()
+    # documents columns per SQLite file as left by init, so instances never re-read the schema
+    _document_columns = {}
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path=None):
         self.use_postgresql = USE_POSTGRESQL
         self.db_path = db_path or os.path.join(os.path.dirname(__file__), 'shiksha_setu.db')
-        self.init_database()
         
-    def get_connection(self):
-        """Get database connection - works for both SQLite and PostgreSQL"""
+        # The backend is fixed for the life of the process, so bind the
+        # specialized implementations once instead of branching on every call
         if self.use_postgresql:
-            conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
-            conn.autocommit = False
-            return conn
+            self.get_connection = self._connect_postgresql
+            self._cursor = self._cursor_postgresql
+            self._stream_cursor = self._stream_cursor_postgresql
+            self._write_result = self._write_result_postgresql
+            self._insert_keywords = self._insert_keywords_postgresql
+            self._init_backend = self._init_postgresql
+            self._search_backend = self._search_documents_postgresql
+            self._keyword_search_backend = self._keyword_search_postgresql
+            self._acquire = self._acquire_postgresql
+            self._execute = self._execute_postgresql
+            # Names PREPAREd on each pooled connection; entries vanish with their connection
+            self._prepared = weakref.WeakKeyDictionary()
+            self._pool = ThreadedConnectionPool(PG_POOL_MIN_CONNECTIONS, PG_POOL_MAX_CONNECTIONS,
+                                                dsn=os.environ.get('DATABASE_URL'))
+        else:
+            self.get_connection = self._connect_sqlite
+            self._cursor = self._cursor_sqlite
+            self._stream_cursor = self._stream_cursor_sqlite
+            self._write_result = self._write_result_sqlite
+            self._insert_keywords = self._insert_keywords_sqlite
+            self._init_backend = self._init_sqlite
+            self._search_backend = self._search_documents_sqlite
+            self._keyword_search_backend = self._keyword_search_sqlite
+            self._acquire = self._acquire_sqlite
+            self._execute = self._execute_sqlite
+            # Idle connections keep their page cache warm between queries; under WAL
+            # several of them can read at once
+            self._sqlite_pool = queue.LifoQueue(maxsize=SQLITE_POOL_SIZE)
+            self._in_memory = self.db_path == ':memory:'
+            if self._in_memory:
+                # Every plain ':memory:' connection is a separate empty database, so give this
+                # manager a named shared-cache one and hold a connection open to keep it alive
+                self.db_path = f'file:shiksha_setu_{id(self):x}?mode=memory&cache=shared'
+                self._memory_anchor = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
+        
+        self._taxonomy_cache = None
+        self._taxonomy_cached_at = 0.0
+        self._taxonomy_lock = threading.Lock()
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        self._document_cache = OrderedDict()
+        self._document_cache_lock = threading.Lock()
+        
+        self.init_database()
+        
+        if USE_POSTGRESQL:
+            # pg_trgm may be missing on managed databases (see _create_auxiliary_tables_postgresql)
+            self._has_pg_trgm = bool(self.execute_query(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'", fetch=True))
         else:
-            return sqlite3.connect(self.db_path)
+            # Known from init_database; the schema only changes there
+            self._has_search_priority = 'search_priority' in DatabaseManager._document_columns.get(self.db_path, ())
     
-    def execute_query(self, query, params=None, fetch=False):
-        """Execute query with parameters - works for both databases"""
-        conn = self.get_connection()
+    @contextmanager
+    def _acquire_postgresql(self):
+        """Borrow a pooled PostgreSQL connection, always returning it to the pool"""
+        conn = self._pool.getconn()
         try:
-            if self.use_postgresql:
-                cursor = conn.cursor(cursor_factory=RealDictCursor)
-                cursor.execute(query, params or ())
-            else:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params or ())
-            
-            if fetch:
-                result = cursor.fetchall()
-                # Convert to list of dictionaries for consistency
-                if self.use_postgresql:
-                    return [dict(row) for row in result]
-                else:
-                    return [dict(row) for row in result]
+            yield conn
+        finally:
+            if conn.closed:
+                # The server dropped it (restart, failover, idle timeout); discard instead of reusing
+                self._pool.putconn(conn, close=True)
             else:
-                conn.commit()
-                return cursor.lastrowid if not self.use_postgresql else cursor.rowcount
-        except Exception as e:
-            conn.rollback()
-            raise e
+                broken = False
+                try:
+                    # End any open transaction (a no-op after commit) so the connection goes back idle
+                    conn.rollback()
+                except Exception as e:
+                    broken = True
+                    logger.warning("Discarding PostgreSQL connection that failed to roll back: %s", e)
+                finally:
+                    self._pool.putconn(conn, close=broken or bool(conn.closed))
+    
+    @contextmanager
+    def _acquire_sqlite(self):
+        """Borrow a pooled SQLite connection, opening a new one when the pool is empty"""
+        try:
+            conn = self._sqlite_pool.get_nowait()
+        except queue.Empty:
+            conn = self._configure_sqlite(sqlite3.connect(self.db_path, uri=True, check_same_thread=False,
+                                                        cached_statements=SQLITE_CACHED_STATEMENTS))
+            conn.row_factory = sqlite3.Row
+        try:
+            yield conn
         finally:
-            conn.close()
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._sqlite_pool.put_nowait(conn)
+            except queue.Full:
+                # Burst connections beyond the pool size are not kept; SQLite recommends
+                # PRAGMA optimize before closing so query-plan statistics stay current
+                conn.execute('PRAGMA optimize')
+                conn.close()
+    
+    def _connect_postgresql(self):
+        """Open a PostgreSQL connection"""
+        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+        conn.autocommit = False
+        return conn
+    
+    def _connect_sqlite(self):
+        """Open a SQLite connection that returns dict-like rows"""
+        conn = self._configure_sqlite(sqlite3.connect(self.db_path, uri=True,
+                                                      cached_statements=SQLITE_CACHED_STATEMENTS))
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def _configure_sqlite(conn):
+        """Apply the per-connection SQLite tuning pragmas"""
+        for pragma in SQLITE_CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @staticmethod
+    def _cursor_postgresql(conn):
+        return conn.cursor(cursor_factory=RealDictCursor)
+    
+    @staticmethod
+    def _cursor_sqlite(conn):
+        return conn.cursor()
+    
+    @staticmethod
+    def _stream_cursor_postgresql(conn):
+        # Named cursors live on the server and hand rows over itersize at a time
+        cursor = conn.cursor(name='documents_stream', cursor_factory=RealDictCursor)
+        cursor.itersize = STREAM_BATCH_ROWS
+        return cursor
+    
+    @staticmethod
+    def _stream_cursor_sqlite(conn):
+        # sqlite3 cursors already step through results lazily
+        return conn.cursor()
+    
+    @staticmethod
+    def _write_result_postgresql(cursor):
+        return cursor.rowcount
+    
+    @staticmethod
+    def _write_result_sqlite(cursor):
+        return cursor.lastrowid
+    
+    @staticmethod
+    def _insert_keywords_postgresql(cursor, keyword_rows):
+        cursor.execute(INSERT_KEYWORDS_UNNEST_SQL, (
+            [document_id for document_id, _ in keyword_rows],
+            [keyword for _, keyword in keyword_rows],
+        ))
+    
+    @staticmethod
+    def _insert_keywords_sqlite(cursor, keyword_rows):
+        cursor.executemany(INSERT_KEYWORD_SQL, [(document_id, keyword, 1) for document_id, keyword in keyword_rows])
+    
+    def _execute_postgresql(self, conn, cursor, query, params, prepare):
+        if not prepare:
+            cursor.execute(query, params)
+            return
+        # psycopg2 has no server-side prepare option, so PREPARE once per connection
+        # and EXECUTE by name afterwards, skipping the parse/plan on repeat calls
+        name = 'stmt_' + hashlib.md5(query.encode()).hexdigest()[:16]
+        prepared = self._prepared.setdefault(conn, set())
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} AS {_to_pg_positional_params(query)}")
+            prepared.add(name)
+        if params:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+    
+    @staticmethod
+    def _execute_sqlite(conn, cursor, query, params, prepare):
+        # sqlite3 already keeps compiled statements in a per-connection cache
+        cursor.execute(query, params)
+    
+    def execute_query(self, query, params=None, fetch=False, prepare=False):
+        """Execute query with parameters - works for both databases
+        
+        prepare=True reuses a server-side prepared statement on PostgreSQL; use it for
+        hot read queries whose SQL text comes from a small fixed set.
+        """
+        with self._acquire() as conn:
+            try:
+                cursor = self._cursor(conn)
+                self._execute(conn, cursor, query, params or (), prepare)
+                
+                if fetch:
+                    # Convert to list of dictionaries for consistency
+                    return [dict(row) for row in cursor.fetchall()]
+                else:
+                    conn.commit()
+                    self._invalidate_caches()
+                    return self._write_result(cursor)
+            except Exception:
+                # A failed rollback (e.g. on a dropped connection) must not mask the original error
+                try:
+                    conn.rollback()
+                except Exception as rollback_error:
+                    logger.warning("Rollback failed: %s", rollback_error)
+                raise
     
     def init_database(self):
         """Initialize database with comprehensive higher education documents"""
-        try:
-            if self.use_postgresql:
-                self._init_postgresql()
-            else:
-                self._init_sqlite()
+        target = os.environ.get('DATABASE_URL') if self.use_postgresql else self.db_path
+        if target in DatabaseManager._initialized_targets:
+            return
+        
+        with DatabaseManager._init_lock:
+            if target in DatabaseManager._initialized_targets:
+                return
+            try:
+                if self._sqlite_is_current():
+                    # Steady-state startup: one read, no lock file, no DDL
+                    DatabaseManager._document_columns[self.db_path] = set(DOCUMENT_FIELDS)
+                else:
+                    with self._process_init_lock():
+                        self._init_backend()
+                DatabaseManager._initialized_targets.add(target)
+                logger.info("✅ Database initialized successfully with comprehensive documents")
                 
-            print("✅ Database initialized successfully with comprehensive documents")
-            
-        except Exception as e:
-            print(f"❌ Database initialization error: {e}")
-            import traceback
-            print(f"🔍 Traceback: {traceback.format_exc()}")
+            except Exception as e:
+                logger.exception("❌ Database initialization error: %s", e)
+    
+    def _sqlite_is_current(self):
+        """Check, without the init lock, whether the SQLite file is already stamped and seeded"""
+        if self.use_postgresql or self._in_memory or not os.path.exists(self.db_path):
+            return False
+        
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SQLITE_SCHEMA_VERSION:
+                return False
+            return conn.execute('SELECT 1 FROM documents LIMIT 1').fetchone() is not None
+    
+    @contextmanager
+    def _process_init_lock(self):
+        """Serialize SQLite schema setup across worker processes with a lock file"""
+        if self.use_postgresql or fcntl is None or self._in_memory:
+            # PostgreSQL takes an advisory lock inside its init transaction instead
+            yield
+            return
+        
+        with open(f"{self.db_path}.init.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
     
     def _init_sqlite(self):
         """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # The inner with-block commits the migration and seed writes, or rolls them back on error;
+        # the DDL scripts run in their own BEGIN/COMMIT because executescript commits first anyway
+        with closing(self._configure_sqlite(sqlite3.connect(self.db_path, uri=True))) as conn, conn:
+            cursor = conn.cursor()
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] == SQLITE_SCHEMA_VERSION:
+                # Schema already current: skip the table_info/migration pass and only check the seed
+                DatabaseManager._document_columns[self.db_path] = set(DOCUMENT_FIELDS)
+                self._check_and_insert_data_sqlite(cursor)
+                return
+            
+            # WAL lets readers and the writer proceed concurrently; the mode is stored in the file
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
+            # Check if we need to migrate from old schema
+            cursor.execute("PRAGMA table_info(documents)")
+            existing_columns = [column[1] for column in cursor.fetchall()]
+            
+            # executescript sends the whole DDL block through one call; BEGIN/COMMIT keeps it to one commit
+            cursor.executescript(f'BEGIN; {SQLITE_SCHEMA_SQL} COMMIT;')
+            
+            self._create_auxiliary_tables_sqlite(cursor, existing_columns)
+            self._check_and_insert_data_sqlite(cursor)
+            # Indexes come after the seed so a fresh database builds each one in a single pass
+            self._create_indexes_sqlite(cursor)
+            # Gather planner statistics for the freshly built indexes; they persist in sqlite_stat1
+            cursor.execute('PRAGMA optimize')
+            
+            # Only stamp files that now carry every column and the FTS tables the search path expects
+            if SQLITE_HAS_FTS5_TRIGRAM and DatabaseManager._document_columns[self.db_path] >= set(DOCUMENT_FIELDS):
+                cursor.execute(f'PRAGMA user_version = {SQLITE_SCHEMA_VERSION}')
+    
+    def _init_postgresql(self):
+        """Initialize PostgreSQL database"""
+        # A failed bootstrap is rolled back when the connection goes back to the pool
+        with self._acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Only one worker process creates the schema and seeds at a time
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (INIT_ADVISORY_LOCK_ID,))
+            
+            # Create documents table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS documents (
+                    id SERIAL PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    document_type TEXT NOT NULL,
+                    category TEXT,
+                    sub_category TEXT,
+                    department TEXT,
+                    created_date DATE,
+                    last_updated DATE,
+                    status TEXT DEFAULT 'Active',
+                    jurisdiction TEXT,
+                    keywords TEXT,
+                    document_url TEXT,
+                    search_priority INTEGER NOT NULL DEFAULT 1,
+                    full_text_content TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create other tables
+            self._create_auxiliary_tables_postgresql(cursor)
+            self._check_and_insert_data_postgresql(cursor)
+            # Indexes come after the seed so a fresh database builds each one in a single pass
+            self._create_indexes_postgresql(cursor)
+            
+            conn.commit()
+    
+    def _create_auxiliary_tables_sqlite(self, cursor, existing_columns):
+        """Migrate SQLite tables created by older schemas"""
+        # Migration logic (same as your original)
+        columns = self._migrate_database(cursor, existing_columns)
+        DatabaseManager._document_columns[self.db_path] = columns
         
-        # Check if we need to migrate from old schema
-        cursor.execute("PRAGMA table_info(documents)")
-        existing_columns = [column[1] for column in cursor.fetchall()]
+        if existing_columns:
+            # Keywords seeded before they were stored lowercased
+            cursor.execute('UPDATE document_keywords SET keyword = lower(keyword) WHERE keyword <> lower(keyword)')
         
-        # Enhanced documents table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                document_type TEXT NOT NULL,
-                category TEXT,
-                sub_category TEXT,
-                department TEXT,
-                created_date DATE,
-                last_updated DATE,
-                status TEXT DEFAULT 'Active',
-                jurisdiction TEXT,
-                keywords TEXT,
-                document_url TEXT,
-                search_priority INTEGER DEFAULT 1,
-                full_text_content TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+        if existing_columns and 'search_priority' in columns:
+            # SQLite cannot add NOT NULL to an existing column, but queries rely on
+            # search_priority never being NULL, so backfill rows from older schemas
+            cursor.execute('UPDATE documents SET search_priority = 1 WHERE search_priority IS NULL')
+    
+    def _create_indexes_sqlite(self, cursor):
+        """Create the SQLite B-tree and full-text indexes"""
+        cursor.executescript(f'''
+            BEGIN;
+            {KEYWORD_INDEXES_SQL}
+            CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type);
+            CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category);
+            CREATE INDEX IF NOT EXISTS idx_documents_department ON documents(department);
+            CREATE INDEX IF NOT EXISTS idx_documents_sub_category ON documents(sub_category);
+            {CREATE_PRIORITY_INDEX_SQL};
+            COMMIT;
         ''')
         
-        # Create other tables and indexes (same as your original code)
-        self._create_auxiliary_tables_sqlite(cursor, existing_columns)
-        self._check_and_insert_data_sqlite(cursor)
-        
-        conn.commit()
-        conn.close()
+        if SQLITE_HAS_FTS5:
+            self._create_fts_sqlite(cursor)
+        if SQLITE_HAS_FTS5_TRIGRAM:
+            self._create_trigram_sqlite(cursor)
     
-    def _init_postgresql(self):
-        """Initialize PostgreSQL database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _create_fts_sqlite(self, cursor):
+        """Create the FTS5 index over documents and the triggers that keep it in sync"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'documents_fts'")
+        row = cursor.fetchone()
+        fts_exists = row is not None
+        if fts_exists and 'porter' not in row[0]:
+            # Built before stemming was enabled; the tokenizer is fixed at creation, so recreate it
+            cursor.execute('DROP TABLE documents_fts')
+            fts_exists = False
         
-        # Create documents table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS documents (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                document_type TEXT NOT NULL,
-                category TEXT,
-                sub_category TEXT,
-                department TEXT,
-                created_date DATE,
-                last_updated DATE,
-                status TEXT DEFAULT 'Active',
-                jurisdiction TEXT,
-                keywords TEXT,
-                document_url TEXT,
-                search_priority INTEGER DEFAULT 1,
-                full_text_content TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+        # Porter stemming lets "policies" match "policy", "schemes" match "scheme", and so on
+        cursor.executescript('''
+            BEGIN;
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, content, keywords, full_text_content,
+                content='documents', content_rowid='id',
+                tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS documents_fts_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts(rowid, title, content, keywords, full_text_content)
+                VALUES (new.id, new.title, new.content, new.keywords, new.full_text_content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_fts_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, content, keywords, full_text_content)
+                VALUES ('delete', old.id, old.title, old.content, old.keywords, old.full_text_content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_fts_au AFTER UPDATE ON documents BEGIN
+                INSERT INTO documents_fts(documents_fts, rowid, title, content, keywords, full_text_content)
+                VALUES ('delete', old.id, old.title, old.content, old.keywords, old.full_text_content);
+                INSERT INTO documents_fts(rowid, title, content, keywords, full_text_content)
+                VALUES (new.id, new.title, new.content, new.keywords, new.full_text_content);
+            END;
+            COMMIT;
         ''')
         
-        # Create other tables and indexes
-        self._create_auxiliary_tables_postgresql(cursor)
-        self._check_and_insert_data_postgresql(cursor)
+        # The rank setting persists in the FTS table's config, so this only runs with the bootstrap
+        cursor.execute("INSERT INTO documents_fts(documents_fts, rank) VALUES ('rank', ?)", (FTS_RANK_FUNCTION,))
         
-        conn.commit()
-        conn.close()
+        if not fts_exists:
+            # Index rows that were stored before the FTS table existed
+            cursor.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
     
-    def _create_auxiliary_tables_sqlite(self, cursor, existing_columns):
-        """Create auxiliary tables for SQLite"""
-        # Create dedicated keywords table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS document_keywords (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                document_id INTEGER,
-                keyword TEXT NOT NULL,
-                keyword_type TEXT,
-                relevance_score INTEGER DEFAULT 1,
-                FOREIGN KEY (document_id) REFERENCES documents (id)
-            )
-        ''')
+    def _create_trigram_sqlite(self, cursor):
+        """Create the FTS5 trigram index behind the basic substring search"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'documents_tg'")
+        tg_exists = cursor.fetchone() is not None
         
-        # Create search index table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_index (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                document_id INTEGER,
-                search_text TEXT,
-                FOREIGN KEY (document_id) REFERENCES documents (id)
-            )
+        cursor.executescript('''
+            BEGIN;
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_tg USING fts5(
+                title, content, keywords,
+                content='documents', content_rowid='id',
+                tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS documents_tg_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_tg(rowid, title, content, keywords)
+                VALUES (new.id, new.title, new.content, new.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_tg_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_tg(documents_tg, rowid, title, content, keywords)
+                VALUES ('delete', old.id, old.title, old.content, old.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_tg_au AFTER UPDATE ON documents BEGIN
+                INSERT INTO documents_tg(documents_tg, rowid, title, content, keywords)
+                VALUES ('delete', old.id, old.title, old.content, old.keywords);
+                INSERT INTO documents_tg(rowid, title, content, keywords)
+                VALUES (new.id, new.title, new.content, new.keywords);
+            END;
+            COMMIT;
         ''')
         
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON document_keywords(keyword)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_department ON documents(department)')
-        
-        # Migration logic (same as your original)
-        self._migrate_database(cursor, existing_columns)
+        if not tg_exists:
+            cursor.execute("INSERT INTO documents_tg(documents_tg) VALUES ('rebuild')")
     
     def _create_auxiliary_tables_postgresql(self, cursor):
         """Create auxiliary tables for PostgreSQL"""
@@ -189,482 +908,234 @@ class DatabaseManager:
             )
         ''')
         
+        # search_vector below indexes all four text columns, so the old concatenated-text copy is dead weight
+        cursor.execute('DROP TABLE IF EXISTS search_index')
+        
+        # Queries order by the bare search_priority column, so older tables get it made NOT NULL;
+        # checked first because SET NOT NULL takes an exclusive lock and scans the table
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_index (
-                id SERIAL PRIMARY KEY,
-                document_id INTEGER REFERENCES documents(id),
-                search_text TEXT
-            )
+            SELECT is_nullable FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'documents'
+              AND column_name = 'search_priority'
         ''')
+        if cursor.fetchone()[0] == 'YES':
+            cursor.execute('UPDATE documents SET search_priority = 1 WHERE search_priority IS NULL')
+            cursor.execute('ALTER TABLE documents ALTER COLUMN search_priority SET DEFAULT 1, '
+                           'ALTER COLUMN search_priority SET NOT NULL')
         
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON document_keywords(keyword)')
+        # Weighted full-text vector maintained by PostgreSQL itself
+        cursor.execute('''
+            ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(keywords, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(full_text_content, '')), 'D')
+            ) STORED
+        ''')
+        
+        # Lowercased keyword list as an array so keyword_search is one GIN probe instead of a
+        # join + GROUP BY
+        cursor.execute('''
+            ALTER TABLE documents ADD COLUMN IF NOT EXISTS keyword_tags text[]
+            GENERATED ALWAYS AS (regexp_split_to_array(lower(trim(keywords)), '\\s*,\\s*')) STORED
+        ''')
+        
+        cursor.execute('CREATE TABLE IF NOT EXISTS schema_meta (version INTEGER NOT NULL)')
+        cursor.execute('SELECT version FROM schema_meta')
+        row = cursor.fetchone()
+        if row is None or row[0] < 1:
+            # Keywords seeded before they were stored lowercased; a full-table rewrite, so only once
+            cursor.execute('UPDATE document_keywords SET keyword = lower(keyword) WHERE keyword <> lower(keyword)')
+        if row is None:
+            cursor.execute('INSERT INTO schema_meta (version) VALUES (%s)', (PG_SCHEMA_VERSION,))
+        elif row[0] != PG_SCHEMA_VERSION:
+            cursor.execute('UPDATE schema_meta SET version = %s', (PG_SCHEMA_VERSION,))
+    
+    def _create_indexes_postgresql(self, cursor):
+        """Create the PostgreSQL B-tree, GIN and trigram indexes"""
+        cursor.execute(KEYWORD_INDEXES_SQL)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_department ON documents(department)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_sub_category ON documents(sub_category)')
+        cursor.execute(CREATE_PRIORITY_INDEX_SQL)
+        cursor.execute('CREATE INDEX IF NOT EXISTS docs_fts_idx ON documents USING GIN (search_vector)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_documents_keyword_tags ON documents USING GIN (keyword_tags)')
+        
+        # Trigram indexes let the planner serve leading-wildcard ILIKE filters from an index
+        cursor.execute('SAVEPOINT trigram_indexes')
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute('CREATE INDEX IF NOT EXISTS docs_title_trgm ON documents USING GIN (title gin_trgm_ops)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS docs_keywords_trgm ON documents USING GIN (keywords gin_trgm_ops)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS docs_content_trgm ON documents USING GIN (content gin_trgm_ops)')
+            cursor.execute('RELEASE SAVEPOINT trigram_indexes')
+        except psycopg2.Error as e:
+            # Managed databases may not allow CREATE EXTENSION; ILIKE still works, just unindexed
+            cursor.execute('ROLLBACK TO SAVEPOINT trigram_indexes')
+            logger.warning("⚠️  pg_trgm unavailable, skipping trigram indexes: %s", e)
     
     def _check_and_insert_data_sqlite(self, cursor):
         """Check and insert data for SQLite"""
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        count = cursor.fetchone()[0]
+        # Only emptiness matters here, so probe for a single row instead of counting them all
+        cursor.execute("SELECT 1 FROM documents LIMIT 1")
+        populated = cursor.fetchone() is not None
         
-        print(f"📊 Database currently has {count} documents")
-        
-        if count == 0:
-            print("📥 Inserting comprehensive higher education documents...")
+        if not populated:
             self._insert_comprehensive_documents(cursor)
-            
-            # Verify insertion
-            cursor.execute("SELECT COUNT(*) FROM documents")
-            new_count = cursor.fetchone()[0]
-            print(f"✅ Now database has {new_count} documents")
         else:
-            print(f"📊 Database contains {count} documents")
+            logger.info("📊 Database already contains documents, skipping seed")
     
     def _check_and_insert_data_postgresql(self, cursor):
         """Check and insert data for PostgreSQL"""
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        count = cursor.fetchone()[0]
-        
-        print(f"📊 Database currently has {count} documents")
+        # Only emptiness matters here, so probe for a single row instead of counting them all
+        cursor.execute("SELECT 1 FROM documents LIMIT 1")
+        populated = cursor.fetchone() is not None
         
-        if count == 0:
-            print("📥 Inserting comprehensive higher education documents...")
+        if not populated:
             self._insert_comprehensive_documents_postgresql(cursor)
-            
-            # Verify insertion
-            cursor.execute("SELECT COUNT(*) FROM documents")
-            new_count = cursor.fetchone()[0]
-            print(f"✅ Now database has {new_count} documents")
         else:
-            print(f"📊 Database contains {count} documents")
+            logger.info("📊 Database already contains documents, skipping seed")
     
     def _migrate_database(self, cursor, existing_columns):
-        """Migrate database schema - same as your original"""
+        """Add any missing documents columns in one batched transaction
+        
+        Returns the set of documents columns present afterwards.
+        """
+        if not existing_columns:
+            # The table was just created from the current schema - nothing to migrate
+            return set(DOCUMENT_FIELDS)
+        
+        columns = set(existing_columns)
+        missing_columns = [(name, column_type) for name, column_type in MIGRATION_COLUMNS
+                           if name not in columns]
+        if not missing_columns:
+            return columns
+        
         try:
-            new_columns = [
-                ('sub_category', 'TEXT'),
-                ('last_updated', 'DATE'),
-                ('status', 'TEXT DEFAULT "Active"'),
-                ('jurisdiction', 'TEXT'),
-                ('search_priority', 'INTEGER DEFAULT 1'),
-                ('full_text_content', 'TEXT')
-            ]
-            
-            for column_name, column_type in new_columns:
-                if column_name not in existing_columns:
-                    print(f"   Adding column: {column_name}")
-                    cursor.execute(f'ALTER TABLE documents ADD COLUMN {column_name} {column_type}')
+            for column_name, _ in missing_columns:
+                logger.info("   Adding column: %s", column_name)
+            alters = ''.join(f'ALTER TABLE documents ADD COLUMN {name} {column_type};\n'
+                             for name, column_type in missing_columns)
+            cursor.executescript(f'BEGIN;\n{alters}COMMIT;')
+            columns.update(name for name, _ in missing_columns)
         except Exception as e:
-            print(f"Migration error: {e}")
+            cursor.connection.rollback()
+            logger.error("Migration error: %s", e)
+        return columns
     
     def _insert_comprehensive_documents(self, cursor):
         """Insert documents for SQLite"""
-        comprehensive_documents = [
-            # Policy Documents
-            {
-                'title': 'National Education Policy 2020 - Complete Document',
-                'content': 'The National Education Policy 2020 is a comprehensive framework for elementary to higher education in India. It focuses on multidisciplinary education, flexibility in learning, internationalization of education, and promoting Indian languages and culture.',
-                'document_type': 'Policy Document',
-                'category': 'National Policy',
-                'sub_category': 'Higher Education Reform',
-                'department': 'Ministry of Education',
-                'created_date': '2020-07-29',
-                'last_updated': '2020-07-29',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'NEP 2020,education policy,India,higher education,school education,multidisciplinary,internationalization,academic bank of credits,multiple entry exit,regulation framework,curriculum reform,assessment reform',
-                'document_url': 'https://www.education.gov.in/sites/upload_files/mhrd/files/NEP_Final_English_0.pdf',
-                'search_priority': 5,
-                'full_text_content': 'National Education Policy 2020 NEP comprehensive framework elementary to higher education India multidisciplinary education flexibility learning internationalization promoting Indian languages culture academic bank of credits multiple entry exit regulatory framework higher education commission'
-            },
-            {
-                'title': 'National Policy on Skill Development and Entrepreneurship 2015',
-                'content': 'Policy framework to rapidly scale up skill development efforts in India and link them to employment opportunities.',
-                'document_type': 'Policy Document',
-                'category': 'Skill Development',
-                'sub_category': 'Entrepreneurship',
-                'department': 'Ministry of Skill Development',
-                'created_date': '2015-07-15',
-                'last_updated': '2015-07-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'skill development,entrepreneurship,vocational training,employment,NSDC,skill India',
-                'document_url': 'https://www.skilldevelopment.gov.in/national-policy.html',
-                'search_priority': 4,
-                'full_text_content': 'National Policy Skill Development Entrepreneurship framework scale up skill development India link employment opportunities vocational training NSDC Skill India'
-            },
-            # Regulations
-            {
-                'title': 'University Grants Commission Regulations 2023',
-                'content': 'Latest UGC regulations governing higher education institutions, including accreditation standards, faculty qualifications, and institutional governance.',
-                'document_type': 'Regulation',
-                'category': 'Higher Education',
-                'sub_category': 'Accreditation Standards',
-                'department': 'University Grants Commission',
-                'created_date': '2023-01-15',
-                'last_updated': '2023-01-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'UGC,regulations,accreditation,quality standards,faculty qualifications,governance,higher education institutions,universities,colleges,compliance,approval process',
-                'document_url': 'https://www.ugc.gov.in/regulations/',
-                'search_priority': 5,
-                'full_text_content': 'University Grants Commission UGC regulations governing higher education institutions accreditation standards faculty qualifications institutional governance quality assurance compliance requirements universities colleges approval process'
-            },
-            {
-                'title': 'AICTE Approval Process Handbook 2023-24',
-                'content': 'Comprehensive handbook detailing the approval process for technical institutions and programs in India.',
-                'document_type': 'Regulation',
-                'category': 'Technical Education',
-                'sub_category': 'Approval Process',
-                'department': 'AICTE',
-                'created_date': '2023-03-01',
-                'last_updated': '2023-03-01',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'AICTE,technical education,engineering,management,pharmacy,architecture,approval process,quality standards,inspection,norms,program approval',
-                'document_url': 'https://www.aicte-india.org/approval-process',
-                'search_priority': 5,
-                'full_text_content': 'AICTE Approval Process Handbook technical institutions programs India engineering management pharmacy architecture quality standards inspection norms program approval'
-            },
-            # Schemes & Programs
-            {
-                'title': 'Scholarship Schemes for Higher Education 2023-24',
-                'content': 'Comprehensive guide to various scholarship schemes available for students in higher education including merit-based and means-based scholarships.',
-                'document_type': 'Scheme',
-                'category': 'Student Financial Aid',
-                'sub_category': 'Scholarships',
-                'department': 'Ministry of Education',
-                'created_date': '2023-04-01',
-                'last_updated': '2023-04-01',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'scholarship,financial aid,merit-based,means-based,SC ST OBC,minority scholarships,post-matric,National Scholarship Portal,student aid,fee reimbursement',
-                'document_url': 'https://scholarships.gov.in/',
-                'search_priority': 5,
-                'full_text_content': 'Scholarship schemes higher education students merit-based means-based SC ST OBC minority post-matric National Scholarship Portal financial aid support eligibility criteria application process fee reimbursement'
-            },
-            # Guidelines
-            {
-                'title': 'Online Education Guidelines and Standards 2023',
-                'content': 'Comprehensive guidelines for online and distance learning programs in higher education institutions.',
-                'document_type': 'Guidelines',
-                'category': 'Digital Education',
-                'sub_category': 'Online Learning',
-                'department': 'University Grants Commission',
-                'created_date': '2023-02-15',
-                'last_updated': '2023-02-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'online education,distance learning,digital education,MOOCs,SWAYAM,learning management system,quality standards,virtual learning,blended learning',
-                'document_url': 'https://www.ugc.gov.in/online-guidelines',
-                'search_priority': 4,
-                'full_text_content': 'Online education guidelines standards distance learning programs higher education institutions MOOCs SWAYAM learning management system quality assurance digital infrastructure virtual learning blended learning'
-            },
-            # Frameworks & Standards
-            {
-                'title': 'National Institutional Ranking Framework Methodology 2023',
-                'content': 'Detailed methodology for NIRF ranking of higher education institutions including parameters for teaching, research, and graduation outcomes.',
-                'document_type': 'Framework',
-                'category': 'Institutional Ranking',
-                'sub_category': 'Ranking Methodology',
-                'department': 'Ministry of Education',
-                'created_date': '2023-02-10',
-                'last_updated': '2023-02-10',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'NIRF,ranking,higher education institutions,methodology,parameters,teaching quality,research,graduation outcomes,academic reputation,institutional ranking',
-                'document_url': 'https://www.nirfindia.org/methodology',
-                'search_priority': 4,
-                'full_text_content': 'National Institutional Ranking Framework NIRF methodology ranking higher education institutions parameters teaching learning resources research professional practice graduation outcomes outreach inclusivity perception'
-            },
-            # Reports & Statistics
-            {
-                'title': 'All India Survey on Higher Education 2021-22',
-                'content': 'Comprehensive survey providing key performance indicators on higher education in India including enrollment, institutions, and teachers.',
-                'document_type': 'Survey Report',
-                'category': 'Education Statistics',
-                'sub_category': 'Higher Education Data',
-                'department': 'Ministry of Education',
-                'created_date': '2023-01-10',
-                'last_updated': '2023-01-10',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'AISHE,higher education,enrollment,universities,colleges,education statistics,performance indicators,institutional data',
-                'document_url': 'https://www.education.gov.in/sites/upload_files/mhrd/files/statistics-new/aishe_2021-22.pdf',
-                'search_priority': 4,
-                'full_text_content': 'All India Survey Higher Education AISHE key performance indicators enrollment institutions teachers universities colleges education statistics institutional data'
-            }
-        ]
-        
-        print(f"📥 Inserting {len(comprehensive_documents)} comprehensive higher education documents...")
-        
-        success_count = 0
-        for i, doc in enumerate(comprehensive_documents):
-            try:
-                cursor.execute('''
-                    INSERT INTO documents (
-                        title, content, document_type, category, sub_category, department,
-                        created_date, last_updated, status, jurisdiction, keywords,
-                        document_url, search_priority, full_text_content
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    doc['title'], doc['content'], doc['document_type'], doc['category'],
-                    doc['sub_category'], doc['department'], doc['created_date'],
-                    doc['last_updated'], doc.get('status', 'Active'), doc.get('jurisdiction', 'National'),
-                    doc['keywords'], doc['document_url'], doc['search_priority'],
-                    doc['full_text_content']
-                ))
-                
-                document_id = cursor.lastrowid
-                success_count += 1
-                
-                # Insert keywords
-                keywords = doc['keywords'].split(',')
-                for keyword in keywords:
-                    clean_keyword = keyword.strip()
-                    if clean_keyword:
-                        cursor.execute('''
-                            INSERT INTO document_keywords (document_id, keyword, relevance_score)
-                            VALUES (?, ?, ?)
-                        ''', (document_id, clean_keyword, 1))
-                
-                # Insert into search index
-                search_text = f"{doc['title']} {doc['content']} {doc['full_text_content']} {doc['keywords']}"
-                cursor.execute('''
-                    INSERT INTO search_index (document_id, search_text)
-                    VALUES (?, ?)
-                ''', (document_id, search_text))
-                
-                print(f"✅ Inserted document {i+1}: {doc['title'][:30]}...")
-                
-            except Exception as e:
-                print(f"❌ Failed to insert document {i+1}: {e}")
-                continue
+        logger.debug("📥 Inserting %d comprehensive higher education documents...", len(SEED_DOCUMENT_ROWS))
+        started = time.perf_counter()
+        
+        rows = SEED_DOCUMENT_ROWS
+        seeded_rows = []
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            # Multi-row INSERT ... RETURNING hands back every new id together with the
+            # fields the side tables need, one statement per batch
+            row_placeholders = f"({', '.join(['?'] * len(DOCUMENT_COLUMNS))})"
+            for start in range(0, len(rows), SQLITE_INSERT_BATCH_ROWS):
+                batch = rows[start:start + SQLITE_INSERT_BATCH_ROWS]
+                cursor.execute(
+                    f"INSERT INTO documents ({', '.join(DOCUMENT_COLUMNS)}) "
+                    f"VALUES {', '.join([row_placeholders] * len(batch))} "
+                    f"RETURNING {', '.join(SEEDED_DOCUMENT_FIELDS)}",
+                    [value for row in batch for value in row]
+                )
+                seeded_rows.extend(cursor.fetchall())
+        else:
+            cursor.executemany(INSERT_DOCUMENT_SQL, rows)
+            cursor.execute(SELECT_SEEDED_DOCUMENTS_SQL)
+            seeded_rows = cursor.fetchall()
+        self._insert_document_keywords(cursor, seeded_rows)
         
-        print(f"🎯 Successfully inserted {success_count}/{len(comprehensive_documents)} documents")
+        logger.info("🎯 Inserted %d documents in %.1fms", len(seeded_rows),
+                    (time.perf_counter() - started) * 1000)
     
     def _insert_comprehensive_documents_postgresql(self, cursor):
         """Insert documents for PostgreSQL"""
-        comprehensive_documents = [
-            # Same document data as above
-            {
-                'title': 'National Education Policy 2020 - Complete Document',
-                'content': 'The National Education Policy 2020 is a comprehensive framework for elementary to higher education in India. It focuses on multidisciplinary education, flexibility in learning, internationalization of education, and promoting Indian languages and culture.',
-                'document_type': 'Policy Document',
-                'category': 'National Policy',
-                'sub_category': 'Higher Education Reform',
-                'department': 'Ministry of Education',
-                'created_date': '2020-07-29',
-                'last_updated': '2020-07-29',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'NEP 2020,education policy,India,higher education,school education,multidisciplinary,internationalization,academic bank of credits,multiple entry exit,regulation framework,curriculum reform,assessment reform',
-                'document_url': 'https://www.education.gov.in/sites/upload_files/mhrd/files/NEP_Final_English_0.pdf',
-                'search_priority': 5,
-                'full_text_content': 'National Education Policy 2020 NEP comprehensive framework elementary to higher education India multidisciplinary education flexibility learning internationalization promoting Indian languages culture academic bank of credits multiple entry exit regulatory framework higher education commission'
-            },
-            {
-                'title': 'National Policy on Skill Development and Entrepreneurship 2015',
-                'content': 'Policy framework to rapidly scale up skill development efforts in India and link them to employment opportunities.',
-                'document_type': 'Policy Document',
-                'category': 'Skill Development',
-                'sub_category': 'Entrepreneurship',
-                'department': 'Ministry of Skill Development',
-                'created_date': '2015-07-15',
-                'last_updated': '2015-07-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'skill development,entrepreneurship,vocational training,employment,NSDC,skill India',
-                'document_url': 'https://www.skilldevelopment.gov.in/national-policy.html',
-                'search_priority': 4,
-                'full_text_content': 'National Policy Skill Development Entrepreneurship framework scale up skill development India link employment opportunities vocational training NSDC Skill India'
-            },
-            {
-                'title': 'University Grants Commission Regulations 2023',
-                'content': 'Latest UGC regulations governing higher education institutions, including accreditation standards, faculty qualifications, and institutional governance.',
-                'document_type': 'Regulation',
-                'category': 'Higher Education',
-                'sub_category': 'Accreditation Standards',
-                'department': 'University Grants Commission',
-                'created_date': '2023-01-15',
-                'last_updated': '2023-01-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'UGC,regulations,accreditation,quality standards,faculty qualifications,governance,higher education institutions,universities,colleges,compliance,approval process',
-                'document_url': 'https://www.ugc.gov.in/regulations/',
-                'search_priority': 5,
-                'full_text_content': 'University Grants Commission UGC regulations governing higher education institutions accreditation standards faculty qualifications institutional governance quality assurance compliance requirements universities colleges approval process'
-            },
-            {
-                'title': 'AICTE Approval Process Handbook 2023-24',
-                'content': 'Comprehensive handbook detailing the approval process for technical institutions and programs in India.',
-                'document_type': 'Regulation',
-                'category': 'Technical Education',
-                'sub_category': 'Approval Process',
-                'department': 'AICTE',
-                'created_date': '2023-03-01',
-                'last_updated': '2023-03-01',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'AICTE,technical education,engineering,management,pharmacy,architecture,approval process,quality standards,inspection,norms,program approval',
-                'document_url': 'https://www.aicte-india.org/approval-process',
-                'search_priority': 5,
-                'full_text_content': 'AICTE Approval Process Handbook technical institutions programs India engineering management pharmacy architecture quality standards inspection norms program approval'
-            },
-            {
-                'title': 'Scholarship Schemes for Higher Education 2023-24',
-                'content': 'Comprehensive guide to various scholarship schemes available for students in higher education including merit-based and means-based scholarships.',
-                'document_type': 'Scheme',
-                'category': 'Student Financial Aid',
-                'sub_category': 'Scholarships',
-                'department': 'Ministry of Education',
-                'created_date': '2023-04-01',
-                'last_updated': '2023-04-01',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'scholarship,financial aid,merit-based,means-based,SC ST OBC,minority scholarships,post-matric,National Scholarship Portal,student aid,fee reimbursement',
-                'document_url': 'https://scholarships.gov.in/',
-                'search_priority': 5,
-                'full_text_content': 'Scholarship schemes higher education students merit-based means-based SC ST OBC minority post-matric National Scholarship Portal financial aid support eligibility criteria application process fee reimbursement'
-            },
-            {
-                'title': 'Online Education Guidelines and Standards 2023',
-                'content': 'Comprehensive guidelines for online and distance learning programs in higher education institutions.',
-                'document_type': 'Guidelines',
-                'category': 'Digital Education',
-                'sub_category': 'Online Learning',
-                'department': 'University Grants Commission',
-                'created_date': '2023-02-15',
-                'last_updated': '2023-02-15',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'online education,distance learning,digital education,MOOCs,SWAYAM,learning management system,quality standards,virtual learning,blended learning',
-                'document_url': 'https://www.ugc.gov.in/online-guidelines',
-                'search_priority': 4,
-                'full_text_content': 'Online education guidelines standards distance learning programs higher education institutions MOOCs SWAYAM learning management system quality assurance digital infrastructure virtual learning blended learning'
-            },
-            {
-                'title': 'National Institutional Ranking Framework Methodology 2023',
-                'content': 'Detailed methodology for NIRF ranking of higher education institutions including parameters for teaching, research, and graduation outcomes.',
-                'document_type': 'Framework',
-                'category': 'Institutional Ranking',
-                'sub_category': 'Ranking Methodology',
-                'department': 'Ministry of Education',
-                'created_date': '2023-02-10',
-                'last_updated': '2023-02-10',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'NIRF,ranking,higher education institutions,methodology,parameters,teaching quality,research,graduation outcomes,academic reputation,institutional ranking',
-                'document_url': 'https://www.nirfindia.org/methodology',
-                'search_priority': 4,
-                'full_text_content': 'National Institutional Ranking Framework NIRF methodology ranking higher education institutions parameters teaching learning resources research professional practice graduation outcomes outreach inclusivity perception'
-            },
-            {
-                'title': 'All India Survey on Higher Education 2021-22',
-                'content': 'Comprehensive survey providing key performance indicators on higher education in India including enrollment, institutions, and teachers.',
-                'document_type': 'Survey Report',
-                'category': 'Education Statistics',
-                'sub_category': 'Higher Education Data',
-                'department': 'Ministry of Education',
-                'created_date': '2023-01-10',
-                'last_updated': '2023-01-10',
-                'status': 'Active',
-                'jurisdiction': 'National',
-                'keywords': 'AISHE,higher education,enrollment,universities,colleges,education statistics,performance indicators,institutional data',
-                'document_url': 'https://www.education.gov.in/sites/upload_files/mhrd/files/statistics-new/aishe_2021-22.pdf',
-                'search_priority': 4,
-                'full_text_content': 'All India Survey Higher Education AISHE key performance indicators enrollment institutions teachers universities colleges education statistics institutional data'
-            }
-        ]
-        
-        print(f"📥 Inserting {len(comprehensive_documents)} comprehensive higher education documents...")
-        
-        success_count = 0
-        for i, doc in enumerate(comprehensive_documents):
-            try:
-                cursor.execute('''
-                    INSERT INTO documents (
-                        title, content, document_type, category, sub_category, department,
-                        created_date, last_updated, status, jurisdiction, keywords,
-                        document_url, search_priority, full_text_content
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                ''', (
-                    doc['title'], doc['content'], doc['document_type'], doc['category'],
-                    doc['sub_category'], doc['department'], doc['created_date'],
-                    doc['last_updated'], doc.get('status', 'Active'), doc.get('jurisdiction', 'National'),
-                    doc['keywords'], doc['document_url'], doc['search_priority'],
-                    doc['full_text_content']
-                ))
-                
-                document_id = cursor.fetchone()[0]
-                success_count += 1
-                
-                # Insert keywords
-                keywords = doc['keywords'].split(',')
-                for keyword in keywords:
-                    clean_keyword = keyword.strip()
-                    if clean_keyword:
-                        cursor.execute('''
-                            INSERT INTO document_keywords (document_id, keyword, relevance_score)
-                            VALUES (%s, %s, %s)
-                        ''', (document_id, clean_keyword, 1))
-                
-                # Insert into search index
-                search_text = f"{doc['title']} {doc['content']} {doc['full_text_content']} {doc['keywords']}"
-                cursor.execute('''
-                    INSERT INTO search_index (document_id, search_text)
-                    VALUES (%s, %s)
-                ''', (document_id, search_text))
-                
-                print(f"✅ Inserted document {i+1}: {doc['title'][:30]}...")
-                
-            except Exception as e:
-                print(f"❌ Failed to insert document {i+1}: {e}")
-                continue
+        logger.debug("📥 Inserting %d comprehensive higher education documents...", len(SEED_DOCUMENT_ROWS))
+        started = time.perf_counter()
+        
+        # A lost seed is simply redone on the next start (the table is still empty), so the
+        # seed transaction doesn't need to wait for its WAL flush
+        cursor.execute("SET LOCAL synchronous_commit = OFF")
+        
+        # Stream every document row in one binary COPY instead of one INSERT per row
+        cursor.copy_expert(
+            f"COPY documents ({', '.join(DOCUMENT_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)",
+            _build_pg_binary_copy_buffer(SEED_DOCUMENT_ROWS, DOCUMENT_COPY_TYPES)
+        )
+        
+        # COPY cannot return ids, so read the seeded rows back in one query. Seeding only runs
+        # on an empty table under the init advisory lock, so every row here is one we just copied
+        cursor.execute(SELECT_SEEDED_DOCUMENTS_SQL)
+        seeded_rows = cursor.fetchall()
+        self._insert_document_keywords(cursor, seeded_rows)
+        
+        logger.info("🎯 Inserted %d documents in %.1fms", len(seeded_rows),
+                    (time.perf_counter() - started) * 1000)
+    
+    def _insert_document_keywords(self, cursor, seeded_rows):
+        """Batch-insert the keyword rows for freshly seeded documents
+        
+        seeded_rows are (id, title, keywords) tuples.
+        """
+        keyword_rows = []
+        for document_id, title, keywords in seeded_rows:
+            keyword_rows.extend((document_id, keyword) for keyword in _split_keywords(keywords))
+            logger.debug("✅ Inserted document %d: %s...", document_id, title[:30])
         
-        print(f"🎯 Successfully inserted {success_count}/{len(comprehensive_documents)} documents")
+        self._insert_keywords(cursor, keyword_rows)
 
     # ALL YOUR EXISTING METHODS REMAIN EXACTLY THE SAME
-    def search_documents(self, query=None, doc_type=None, category=None, department=None, use_advanced=True):
+    def search_documents(self, query=None, doc_type=None, category=None, department=None, use_advanced=True,
+                         limit=SEARCH_PAGE_SIZE, offset=0):
         """Enhanced search documents with multiple criteria and better ranking"""
+        if query:
+            query = _normalize_search_query(query)
+        cache_key = (query, doc_type, category, department, use_advanced, limit, offset)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                self._search_cache.move_to_end(cache_key)
+                return list(cached)
+        
         try:
-            if self.use_postgresql:
-                return self._search_documents_postgresql(query, doc_type, category, department, use_advanced)
-            else:
-                return self._search_documents_sqlite(query, doc_type, category, department, use_advanced)
+            results = self._search_backend(query, doc_type, category, department, use_advanced, limit, offset)
         except Exception as e:
-            print(f"Database search error: {e}")
+            logger.error("Database search error: %s", e)
             return []
+        
+        with self._search_cache_lock:
+            self._search_cache[cache_key] = results
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return list(results)
 
-    def _search_documents_sqlite(self, query=None, doc_type=None, category=None, department=None, use_advanced=True):
+    def _search_documents_sqlite(self, query=None, doc_type=None, category=None, department=None, use_advanced=True,
+                                 limit=SEARCH_PAGE_SIZE, offset=0):
         """SQLite implementation of search"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Check if search_priority column exists
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(documents)")
-        columns = [column[1] for column in cursor.fetchall()]
-        has_search_priority = 'search_priority' in columns
-        
-        if use_advanced and query and has_search_priority:
-            base_query = '''
-                SELECT d.*, 
-                       (CASE 
-                        WHEN d.title LIKE ? THEN 5
-                        WHEN d.keywords LIKE ? THEN 3
-                        WHEN d.content LIKE ? THEN 2
-                        ELSE 1
-                       END) * COALESCE(d.search_priority, 1) as relevance
-                FROM documents d
-                WHERE (d.title LIKE ? OR d.content LIKE ? OR d.keywords LIKE ? OR d.full_text_content LIKE ?)
-            '''
-            params = [f'%{query}%'] * 7
+        with self._acquire() as conn:
+            return self._run_search_sqlite(conn, query, doc_type, category, department, use_advanced, limit, offset)
+    
+    def _run_search_sqlite(self, conn, query, doc_type, category, department, use_advanced, limit, offset):
+        match_query = _fts5_match_query(query) if SQLITE_HAS_FTS5 and use_advanced and query else None
+        use_fts = bool(match_query) and self._has_search_priority
+        
+        if use_fts:
+            base_query = SEARCH_FTS_SQLITE_SQL
+            params = [match_query]
         else:
-            base_query = "SELECT * FROM documents WHERE 1=1"
+            base_query = f"SELECT {SEARCH_SELECT_LIST} FROM documents WHERE 1=1"
             params = []
-            if query:
+            if query and SQLITE_HAS_FTS5_TRIGRAM and len(query) >= TRIGRAM_MIN_QUERY_LENGTH:
+                # A quoted trigram phrase is a case-insensitive substring match, like the LIKE below
+                base_query += SEARCH_TRIGRAM_FILTER_SQL
+                params.append('"' + query.replace('"', '""') + '"')
+            elif query:
                 base_query += " AND (title LIKE ? OR content LIKE ? OR keywords LIKE ?)"
                 search_term = f"%{query}%"
                 params.extend([search_term, search_term, search_term])
@@ -683,33 +1154,43 @@ class DatabaseManager:
             params.append(department)
         
         # Add ordering
-        if use_advanced and query and has_search_priority:
-            base_query += " ORDER BY relevance DESC, COALESCE(search_priority, 1) DESC"
+        if use_fts:
+            base_query += " ORDER BY relevance DESC, search_priority DESC"
         else:
             base_query += " ORDER BY id DESC"
         
-        df = pd.read_sql_query(base_query, conn, params=params)
-        conn.close()
+        base_query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
         
-        return df.to_dict('records')
+        cursor = conn.execute(base_query, params)
+        return [dict(row) for row in cursor.fetchall()]
 
-    def _search_documents_postgresql(self, query=None, doc_type=None, category=None, department=None, use_advanced=True):
+    def _search_documents_postgresql(self, query=None, doc_type=None, category=None, department=None, use_advanced=True,
+                                     limit=SEARCH_PAGE_SIZE, offset=0):
         """PostgreSQL implementation of search"""
-        if use_advanced and query:
-            base_query = '''
-                SELECT d.*, 
-                       (CASE 
-                        WHEN d.title ILIKE %s THEN 5
-                        WHEN d.keywords ILIKE %s THEN 3
-                        WHEN d.content ILIKE %s THEN 2
-                        ELSE 1
-                       END) * COALESCE(d.search_priority, 1) as relevance
-                FROM documents d
-                WHERE (d.title ILIKE %s OR d.content ILIKE %s OR d.keywords ILIKE %s OR d.full_text_content ILIKE %s)
+        if use_advanced and query and self._has_pg_trgm:
+            # Full-text match on search_vector, widened with trigram similarity on title and
+            # keywords so misspelt queries still hit; every predicate is served by a GIN index
+            base_query = f'''
+                SELECT {SEARCH_SELECT_LIST_D},
+                       (ts_rank_cd(d.search_vector, q) + GREATEST(similarity(d.title, %s), similarity(d.keywords, %s)))
+                       * d.search_priority as relevance
+                FROM documents d, plainto_tsquery('english', %s) q
+                WHERE (d.search_vector @@ q OR d.title %% %s OR d.keywords %% %s)
+            '''
+            params = [query] * 5
+        elif use_advanced and query:
+            # Full-text match served by the GIN index on search_vector, ranked by
+            # weighted cover density (title > keywords > content > full text)
+            base_query = f'''
+                SELECT {SEARCH_SELECT_LIST_D},
+                       ts_rank_cd(d.search_vector, q) * d.search_priority as relevance
+                FROM documents d, plainto_tsquery('english', %s) q
+                WHERE d.search_vector @@ q
             '''
-            params = [f'%{query}%'] * 7
+            params = [query]
         else:
-            base_query = "SELECT * FROM documents WHERE 1=1"
+            base_query = f"SELECT {SEARCH_SELECT_LIST} FROM documents WHERE 1=1"
             params = []
             if query:
                 base_query += " AND (title ILIKE %s OR content ILIKE %s OR keywords ILIKE %s)"
@@ -731,125 +1212,157 @@ class DatabaseManager:
         
         # Add ordering
         if use_advanced and query:
-            base_query += " ORDER BY relevance DESC, COALESCE(search_priority, 1) DESC"
+            base_query += " ORDER BY relevance DESC, search_priority DESC"
         else:
             base_query += " ORDER BY id DESC"
         
-        results = self.execute_query(base_query, params, fetch=True)
+        base_query += " LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        
+        # Filters only toggle fixed clauses, so there are a handful of distinct SQL texts to prepare
+        results = self.execute_query(base_query, params, fetch=True, prepare=True)
         return results
 
+    def iter_all_documents(self):
+        """Yield every document in listing order, streaming rows instead of fetching them all at once"""
+        with self._acquire() as conn:
+            cursor = self._stream_cursor(conn)
+            try:
+                cursor.execute(f"SELECT {DOCUMENT_SELECT_LIST} FROM documents "
+                               "ORDER BY search_priority DESC, id DESC")
+                for row in cursor:
+                    yield dict(row)
+            finally:
+                cursor.close()
+
     def get_all_documents(self):
         """Get all documents for display"""
         try:
-            if self.use_postgresql:
-                query = "SELECT * FROM documents ORDER BY COALESCE(search_priority, 1) DESC, id DESC"
-            else:
-                query = "SELECT * FROM documents ORDER BY COALESCE(search_priority, 1) DESC, id DESC"
-                
-            results = self.execute_query(query, fetch=True)
-            return results
+            return list(self.iter_all_documents())
         except Exception as e:
-            print(f"Error getting all documents: {e}")
+            logger.error("Error getting all documents: %s", e)
             return []
 
+    def get_documents_page(self, limit=DOCUMENTS_PAGE_SIZE, cursor=None):
+        """Get one page of documents in listing order
+        
+        cursor is the (search_priority, id) of the last row already shown; the returned
+        next_cursor is None on the last page.
+        """
+        # A non-positive LIMIT means "no limit" on SQLite and is an error on PostgreSQL
+        limit = max(1, limit)
+        try:
+            query = f"SELECT {DOCUMENT_SELECT_LIST} FROM documents"
+            params = []
+            if cursor:
+                # Keyset pagination: seek straight past the previous page via idx_documents_search_priority_id
+                query += f" WHERE (search_priority, id) < ({PLACEHOLDER}, {PLACEHOLDER})"
+                params.extend(cursor)
+            query += f" ORDER BY search_priority DESC, id DESC LIMIT {PLACEHOLDER}"
+            # One extra row tells us whether another page follows
+            params.append(limit + 1)
+            
+            rows = self.execute_query(query, params, fetch=True)
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = (rows[-1]['search_priority'], rows[-1]['id'])
+            return {'rows': rows, 'next_cursor': next_cursor}
+        except Exception as e:
+            logger.error("Error getting documents page: %s", e)
+            return {'rows': [], 'next_cursor': None}
+
     def get_document_by_id(self, document_id):
         """Get a specific document by ID"""
+        with self._document_cache_lock:
+            document = self._document_cache.get(document_id)
+            if document is not None:
+                self._document_cache.move_to_end(document_id)
+                return dict(document)
+        
         try:
-            if self.use_postgresql:
-                query = "SELECT * FROM documents WHERE id = %s"
-            else:
-                query = "SELECT * FROM documents WHERE id = ?"
-                
-            results = self.execute_query(query, (document_id,), fetch=True)
-            return results[0] if results else None
+            query = f"SELECT {DOCUMENT_SELECT_LIST} FROM documents WHERE id = {PLACEHOLDER}"
+            results = self.execute_query(query, (document_id,), fetch=True, prepare=True)
         except Exception as e:
-            print(f"Error getting document by ID: {e}")
+            logger.error("Error getting document by ID: %s", e)
             return None
+        if not results:
+            return None
+        
+        with self._document_cache_lock:
+            self._document_cache[document_id] = results[0]
+            if len(self._document_cache) > DOCUMENT_CACHE_SIZE:
+                self._document_cache.popitem(last=False)
+        return dict(results[0])
 
     def keyword_search(self, keywords):
         """Precise keyword-based search"""
         try:
-            keyword_list = [k.strip() for k in keywords.split(',')]
-            
-            if self.use_postgresql:
-                placeholders = ','.join(['%s'] * len(keyword_list))
-                query = f'''
-                    SELECT d.*, COUNT(dk.keyword) as keyword_matches
-                    FROM documents d
-                    JOIN document_keywords dk ON d.id = dk.document_id
-                    WHERE dk.keyword IN ({placeholders})
-                    GROUP BY d.id
-                    ORDER BY keyword_matches DESC, COALESCE(d.search_priority, 1) DESC
-                '''
-            else:
-                placeholders = ','.join(['?'] * len(keyword_list))
-                query = f'''
-                    SELECT d.*, COUNT(dk.keyword) as keyword_matches
-                    FROM documents d
-                    JOIN document_keywords dk ON d.id = dk.document_id
-                    WHERE dk.keyword IN ({placeholders})
-                    GROUP BY d.id
-                    ORDER BY keyword_matches DESC, COALESCE(d.search_priority, 1) DESC
-                '''
-            
-            results = self.execute_query(query, keyword_list, fetch=True)
-            return results
-            
+            keyword_list = _split_keywords(keywords)
+            return self._keyword_search_backend(keyword_list)
         except Exception as e:
-            print(f"Keyword search error: {e}")
+            logger.error("Keyword search error: %s", e)
             return []
 
-    def get_categories(self):
-        """Get all unique categories"""
+    def _keyword_search_sqlite(self, keyword_list):
+        """SQLite implementation of keyword search"""
+        return self.execute_query(KEYWORD_SEARCH_SQLITE_SQL, (json.dumps(keyword_list),), fetch=True)
+
+    def _keyword_search_postgresql(self, keyword_list):
+        """PostgreSQL implementation of keyword search, served by the GIN index on keyword_tags"""
+        return self.execute_query(KEYWORD_SEARCH_POSTGRESQL_SQL, (keyword_list, keyword_list),
+                                  fetch=True, prepare=True)
+
+    def get_taxonomies(self):
+        """Get all unique categories, document types, departments and sub-categories in one query"""
+        with self._taxonomy_lock:
+            if (self._taxonomy_cache is not None
+                    and time.monotonic() - self._taxonomy_cached_at < TAXONOMY_CACHE_TTL_SECONDS):
+                return self._taxonomy_cache
         try:
-            query = "SELECT DISTINCT category FROM documents WHERE category IS NOT NULL ORDER BY category"
-            results = self.execute_query(query, fetch=True)
-            return [row['category'] for row in results]
+            taxonomies = {key: [] for key in TAXONOMY_FIELDS.values()}
+            for row in self.execute_query(SELECT_TAXONOMIES_SQL, fetch=True):
+                taxonomies[TAXONOMY_FIELDS[row['field']]].append(row['value'])
         except Exception as e:
-            print(f"Error getting categories: {e}")
-            return []
+            logger.error("Error getting taxonomies: %s", e)
+            return {key: [] for key in TAXONOMY_FIELDS.values()}
+        with self._taxonomy_lock:
+            self._taxonomy_cache = taxonomies
+            self._taxonomy_cached_at = time.monotonic()
+        return taxonomies
+
+    def _invalidate_caches(self):
+        """Drop the cached taxonomies, search results and documents so the next read sees fresh data"""
+        with self._taxonomy_lock:
+            self._taxonomy_cache = None
+        with self._search_cache_lock:
+            self._search_cache.clear()
+        with self._document_cache_lock:
+            self._document_cache.clear()
+
+    def get_categories(self):
+        """Get all unique categories"""
+        return list(self.get_taxonomies()['categories'])
 
     def get_document_types(self):
         """Get all unique document types"""
-        try:
-            query = "SELECT DISTINCT document_type FROM documents WHERE document_type IS NOT NULL ORDER BY document_type"
-            results = self.execute_query(query, fetch=True)
-            return [row['document_type'] for row in results]
-        except Exception as e:
-            print(f"Error getting document types: {e}")
-            return []
+        return list(self.get_taxonomies()['document_types'])
 
     def get_departments(self):
         """Get all unique departments"""
-        try:
-            query = "SELECT DISTINCT department FROM documents WHERE department IS NOT NULL ORDER BY department"
-            results = self.execute_query(query, fetch=True)
-            return [row['department'] for row in results]
-        except Exception as e:
-            print(f"Error getting departments: {e}")
-            return []
+        return list(self.get_taxonomies()['departments'])
 
     def get_sub_categories(self):
         """Get all unique sub-categories"""
-        try:
-            query = "SELECT DISTINCT sub_category FROM documents WHERE sub_category IS NOT NULL ORDER BY sub_category"
-            results = self.execute_query(query, fetch=True)
-            return [row['sub_category'] for row in results]
-        except Exception as e:
-            print(f"Error getting sub-categories: {e}")
-            return []
+        return list(self.get_taxonomies()['sub_categories'])
 
 # Test function
 def test_comprehensive_database():
     """Test the comprehensive database functionality"""
     print("🧪 Testing comprehensive database...")
     
-    # Delete existing SQLite database to force recreation
-    if os.path.exists('shiksha_setu.db'):
-        os.remove('shiksha_setu.db')
-        print("🗑️  Removed old database file")
-    
-    db = DatabaseManager()
+    # A private in-memory database is built from scratch every run and leaves shiksha_setu.db alone
+    db = DatabaseManager(db_path=':memory:')
     documents = db.get_all_documents()
     print(f"📄 Loaded {len(documents)} documents from database")
     
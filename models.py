@@ -1,7 +1,12 @@
 import os
-from datetime import datetime, timedelta
+import weakref
 import hashlib
+import hmac
 import secrets
+import threading
+import queue
+import time
+from database import SQLITE_CONNECTION_PRAGMAS, _to_pg_positional_params
 
 # Database configuration - automatically switches between SQLite and PostgreSQL
 USE_POSTGRESQL = os.environ.get('DATABASE_URL') is not None
@@ -11,6 +16,7 @@ if USE_POSTGRESQL:
     try:
         import psycopg2
         from psycopg2.extras import RealDictCursor
+        from psycopg2.pool import ThreadedConnectionPool
         print("🔗 Using PostgreSQL for authentication")
     except ImportError:
         print("⚠️  PostgreSQL not available, falling back to SQLite")
@@ -20,22 +26,89 @@ else:
     import sqlite3
     print("🔗 Using SQLite for authentication")
 
+AUTH_DB_PATH = os.path.join(os.path.dirname(__file__), 'users.db')
+
+# Bind-parameter marker for the active driver, so each query is written once
+PH = '%s' if USE_POSTGRESQL else '?'
+
+# Token timestamps are computed by the database, so expiries are written and
+# compared against the same clock and no Python datetime is bound per call
+SQL_NOW = 'NOW()' if USE_POSTGRESQL else "datetime('now')"
+SQL_TOKEN_EXPIRY = "NOW() + INTERVAL '24 hours'" if USE_POSTGRESQL else "datetime('now', '+24 hours')"
+
+# Auth queries, specialized to the active driver once at import so helpers just look them up
+_Q = {name: sql.replace('?', PH) for name, sql in {
+    # The token is bound twice so users created without one get no expiry
+    'create_user': 'INSERT INTO users (username, email, verification_token, token_expiry) '
+                   f'VALUES (?, ?, ?, CASE WHEN CAST(? AS TEXT) IS NULL THEN NULL ELSE {SQL_TOKEN_EXPIRY} END)'
+                   + (' RETURNING id' if USE_POSTGRESQL else ''),
+    'user_by_identifier': 'SELECT * FROM users WHERE username = ? OR email = ?',
+    'verify_email': 'UPDATE users SET email_verified = TRUE, verification_token = NULL, token_expiry = NULL WHERE id = ?',
+    'set_password': 'UPDATE users SET password_hash = ? WHERE id = ?',
+    'complete_signup': 'UPDATE users SET password_hash = ?, email_verified = TRUE, verification_token = NULL, '
+                       'token_expiry = NULL WHERE id = ?',
+    'user_by_token': f'SELECT * FROM users WHERE verification_token = ? AND token_expiry > {SQL_NOW}',
+    'cleanup_tokens': f'UPDATE users SET verification_token = NULL, token_expiry = NULL WHERE token_expiry < {SQL_NOW}',
+}.items()}
+
+# On PostgreSQL each auth query is PREPAREd once per connection and then EXECUTEd by name,
+# so the server skips the parse/plan on every call after the first
+_PG_PREPARE = {name: f'PREPARE auth_{name} AS {_to_pg_positional_params(sql)}' for name, sql in _Q.items()}
+_PG_EXECUTE = {name: f"EXECUTE auth_{name}" + (f" ({', '.join(['%s'] * sql.count('%s'))})" if '%s' in sql else '')
+               for name, sql in _Q.items()}
+# Names PREPAREd on each pooled PostgreSQL connection; entries vanish with their connection
+_pg_prepared = weakref.WeakKeyDictionary()
+
+# Auth connections are pooled per process so requests skip the connect/handshake cost.
+# Login and registration are light traffic and each worker also holds database.py's
+# document pool, so keep this one small to stay within hosted Postgres connection limits
+PG_POOL_MIN_CONNECTIONS = 1
+PG_POOL_MAX_CONNECTIONS = 5
+SQLITE_POOL_SIZE = 8
+# Applied once per physical SQLite connection when it joins the pool: the same tuning as
+# the documents database, plus WAL so readers run alongside the writer
+AUTH_SQLITE_PRAGMAS = ('PRAGMA journal_mode=WAL',) + SQLITE_CONNECTION_PRAGMAS
+
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+# Idle SQLite connections; LIFO keeps the most recently used (warmest) one on top
+_sqlite_pool = queue.LifoQueue(maxsize=SQLITE_POOL_SIZE)
+
+VERIFICATION_CODE_LENGTH = 6
+
+# scrypt cost parameters for password hashes (16 MB of memory per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+PASSWORD_SALT_BYTES = 16
+
+ACTIVE_TOKEN_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_users_vt_active ON users(verification_token) '
+    'WHERE verification_token IS NOT NULL'
+)
+# Expired verification tokens are cleared in one UPDATE this often
+TOKEN_CLEANUP_INTERVAL_SECONDS = 3600
+_token_cleanup_started = False
+_token_cleanup_lock = threading.Lock()
+
 # ADD THIS FUNCTION - it was missing
 def init_auth_db():
     """Initialize authentication database with better error handling"""
     try:
         if USE_POSTGRESQL:
-            return _init_auth_db_postgresql()
+            _init_auth_db_postgresql()
         else:
-            return _init_auth_db_sqlite()
+            _init_auth_db_sqlite()
     except Exception as e:
         print(f"❌ Error initializing authentication database: {e}")
         raise
+    
+    start_token_cleanup()
 
 def _init_auth_db_sqlite():
     """Initialize SQLite authentication database"""
-    db_path = os.path.join(os.path.dirname(__file__), 'users.db')
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(AUTH_DB_PATH)
     c = conn.cursor()
     
     c.execute('''CREATE TABLE IF NOT EXISTS users
@@ -51,7 +124,9 @@ def _init_auth_db_sqlite():
     # Create indexes for better performance
     c.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    c.execute('CREATE INDEX IF NOT EXISTS idx_users_verification_token ON users(verification_token)')
+    # Only live tokens are ever looked up, so the partial index skips every verified user
+    c.execute('DROP INDEX IF EXISTS idx_users_verification_token')
+    c.execute(ACTIVE_TOKEN_INDEX_SQL)
     
     conn.commit()
     conn.close()
@@ -78,51 +153,135 @@ def _init_auth_db_postgresql():
     # Create indexes
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_verification_token ON users(verification_token)')
+    # Only live tokens are ever looked up, so the partial index skips every verified user
+    cursor.execute('DROP INDEX IF EXISTS idx_users_verification_token')
+    cursor.execute(ACTIVE_TOKEN_INDEX_SQL)
     
     conn.commit()
     conn.close()
     print("✅ PostgreSQL authentication database initialized successfully")
 
+def _get_pg_pool():
+    """Create the PostgreSQL connection pool on first use"""
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                _pg_pool = ThreadedConnectionPool(PG_POOL_MIN_CONNECTIONS, PG_POOL_MAX_CONNECTIONS,
+                                                  os.environ.get('DATABASE_URL'))
+    return _pg_pool
+
+def _release_postgresql(conn):
+    """Return a PostgreSQL connection to the pool, dropping it if the server closed it"""
+    if conn.closed:
+        _get_pg_pool().putconn(conn, close=True)
+        return
+    broken = False
+    try:
+        # End any open transaction so the next borrower starts clean
+        conn.rollback()
+    except Exception as e:
+        # The connection broke before conn.closed noticed; discard it rather than leak the slot
+        broken = True
+        print(f"⚠️  Discarding PostgreSQL auth connection that failed to roll back: {e}")
+    finally:
+        _get_pg_pool().putconn(conn, close=broken or bool(conn.closed))
+
+def _release_sqlite(conn):
+    """Return a SQLite connection to the pool, closing it if the pool is full"""
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _sqlite_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+class _PoolConn:
+    """Pooled connection proxy; close() hands the connection back to the pool instead of closing it"""
+    
+    def __init__(self, raw, release):
+        self._raw = raw
+        self._release = release
+    
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+    
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._release(raw)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Commit on success, roll back on error, and always hand the connection back
+        try:
+            if exc_type is None:
+                self._raw.commit()
+            else:
+                try:
+                    self._raw.rollback()
+                except Exception as e:
+                    # A failed rollback must not replace the caller's original exception
+                    print(f"⚠️  Rollback failed: {e}")
+        finally:
+            self.close()
+    
+    def __del__(self):
+        # Callers that miss close() on an error path must not leak a pool slot
+        try:
+            self.close()
+        except Exception:
+            pass
+
+def _connect_sqlite():
+    """Open a new SQLite auth connection with the tuning pragmas applied"""
+    conn = sqlite3.connect(AUTH_DB_PATH, check_same_thread=False)
+    for pragma in AUTH_SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def _row_cursor(conn):
+    """Cursor whose rows support access by column name on either driver"""
+    if USE_POSTGRESQL:
+        # RealDictCursor builds each row dict in C, matching sqlite3.Row's by-name access
+        return conn.cursor(cursor_factory=RealDictCursor)
+    return conn.cursor()
+
+def _execute(cursor, name, params):
+    """Run the named auth query, using a per-connection prepared statement on PostgreSQL"""
+    if not USE_POSTGRESQL:
+        # sqlite3 already keeps compiled statements in a per-connection cache
+        cursor.execute(_Q[name], params)
+        return
+    prepared = _pg_prepared.setdefault(cursor.connection, set())
+    if name not in prepared:
+        cursor.execute(_PG_PREPARE[name])
+        prepared.add(name)
+    cursor.execute(_PG_EXECUTE[name], params)
+
 def get_auth_db_connection():
-    """Get connection to authentication database"""
+    """Get a pooled connection to the authentication database"""
     if USE_POSTGRESQL:
-        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
-        conn.autocommit = False
-        return conn
-    else:
-        db_path = os.path.join(os.path.dirname(__file__), 'users.db')
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return _PoolConn(_get_pg_pool().getconn(), _release_postgresql)
+    
+    try:
+        conn = _sqlite_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect_sqlite()
+    return _PoolConn(conn, _release_sqlite)
 
 # ALL YOUR EXISTING FUNCTIONS REMAIN EXACTLY THE SAME - JUST UPDATE THE QUERIES
 
 def create_user(username, email, verification_token=None):
     """Create a new user with verification token"""
     try:
-        conn = get_auth_db_connection()
-        cursor = conn.cursor()
-        
-        token_expiry = datetime.now() + timedelta(hours=24) if verification_token else None
-        
-        if USE_POSTGRESQL:
-            cursor.execute(
-                'INSERT INTO users (username, email, verification_token, token_expiry) VALUES (%s, %s, %s, %s) RETURNING id',
-                (username, email, verification_token, token_expiry)
-            )
-            user_id = cursor.fetchone()[0]
-        else:
-            cursor.execute(
-                'INSERT INTO users (username, email, verification_token, token_expiry) VALUES (?, ?, ?, ?)',
-                (username, email, verification_token, token_expiry)
-            )
-            user_id = cursor.lastrowid
-            
-        conn.commit()
-        conn.close()
-        
-        return user_id
+        with get_auth_db_connection() as conn:
+            cursor = conn.cursor()
+            _execute(cursor, 'create_user', (username, email, verification_token, verification_token))
+            return cursor.fetchone()[0] if USE_POSTGRESQL else cursor.lastrowid
     except Exception as e:
         if 'unique' in str(e).lower():
             raise ValueError("Username or email already exists")
@@ -132,57 +291,19 @@ def create_user(username, email, verification_token=None):
 def get_user_by_username_or_email(identifier):
     """Get user by username or email"""
     try:
-        conn = get_auth_db_connection()
-        cursor = conn.cursor()
-        
-        if USE_POSTGRESQL:
-            cursor.execute(
-                'SELECT * FROM users WHERE username = %s OR email = %s', 
-                (identifier, identifier)
-            )
-        else:
-            cursor.execute(
-                'SELECT * FROM users WHERE username = ? OR email = ?', 
-                (identifier, identifier)
-            )
-            
-        if USE_POSTGRESQL:
-            user = cursor.fetchone()
-            if user:
-                columns = [desc[0] for desc in cursor.description]
-                user_dict = dict(zip(columns, user))
-                conn.close()
-                return user_dict
-        else:
-            user = cursor.fetchone()
-            conn.close()
-            return user
-            
-        conn.close()
-        return None
+        with get_auth_db_connection() as conn:
+            cursor = _row_cursor(conn)
+            _execute(cursor, 'user_by_identifier', (identifier, identifier))
+            return cursor.fetchone()
     except Exception as e:
         print(f"❌ Error getting user: {e}")
         return None
 
 def verify_user_email(user_id):
-    """Mark user's email as verified"""
+    """Mark user's email as verified (signup uses complete_signup instead)"""
     try:
-        conn = get_auth_db_connection()
-        cursor = conn.cursor()
-        
-        if USE_POSTGRESQL:
-            cursor.execute(
-                'UPDATE users SET email_verified = TRUE, verification_token = NULL, token_expiry = NULL WHERE id = %s',
-                (user_id,)
-            )
-        else:
-            cursor.execute(
-                'UPDATE users SET email_verified = TRUE, verification_token = NULL, token_expiry = NULL WHERE id = ?',
-                (user_id,)
-            )
-            
-        conn.commit()
-        conn.close()
+        with get_auth_db_connection() as conn:
+            _execute(conn.cursor(), 'verify_email', (user_id,))
         return True
     except Exception as e:
         print(f"❌ Error verifying user email: {e}")
@@ -191,66 +312,88 @@ def verify_user_email(user_id):
 def set_user_password(user_id, password_hash):
     """Set user password hash"""
     try:
-        conn = get_auth_db_connection()
-        cursor = conn.cursor()
-        
-        if USE_POSTGRESQL:
-            cursor.execute(
-                'UPDATE users SET password_hash = %s WHERE id = %s',
-                (password_hash, user_id)
-            )
-        else:
-            cursor.execute(
-                'UPDATE users SET password_hash = ? WHERE id = ?',
-                (password_hash, user_id)
-            )
-            
-        conn.commit()
-        conn.close()
+        with get_auth_db_connection() as conn:
+            _execute(conn.cursor(), 'set_password', (password_hash, user_id))
         return True
     except Exception as e:
         print(f"❌ Error setting user password: {e}")
         return False
 
+def complete_signup(user_id, password_hash):
+    """Set the password and mark the email verified in a single UPDATE"""
+    try:
+        with get_auth_db_connection() as conn:
+            _execute(conn.cursor(), 'complete_signup', (password_hash, user_id))
+        return True
+    except Exception as e:
+        print(f"❌ Error completing signup: {e}")
+        return False
+
 def get_user_by_verification_token(token):
     """Get user by verification token if not expired"""
     try:
-        conn = get_auth_db_connection()
-        cursor = conn.cursor()
-        
-        if USE_POSTGRESQL:
-            cursor.execute(
-                'SELECT * FROM users WHERE verification_token = %s AND token_expiry > %s',
-                (token, datetime.now())
-            )
-            user = cursor.fetchone()
-            if user:
-                columns = [desc[0] for desc in cursor.description]
-                user_dict = dict(zip(columns, user))
-                conn.close()
-                return user_dict
-        else:
-            cursor.execute(
-                'SELECT * FROM users WHERE verification_token = ? AND token_expiry > ?',
-                (token, datetime.now())
-            )
-            user = cursor.fetchone()
-            conn.close()
-            return user
-            
-        conn.close()
-        return None
+        with get_auth_db_connection() as conn:
+            cursor = _row_cursor(conn)
+            _execute(cursor, 'user_by_token', (token,))
+            return cursor.fetchone()
     except Exception as e:
         print(f"❌ Error getting user by token: {e}")
         return None
 
+def cleanup_expired_tokens():
+    """Clear expired verification tokens in a single UPDATE; returns the number of users touched"""
+    try:
+        with get_auth_db_connection() as conn:
+            cursor = conn.cursor()
+            _execute(cursor, 'cleanup_tokens', ())
+            return cursor.rowcount
+    except Exception as e:
+        print(f"❌ Error cleaning up expired tokens: {e}")
+        return 0
+
+def _token_cleanup_loop():
+    while True:
+        cleanup_expired_tokens()
+        time.sleep(TOKEN_CLEANUP_INTERVAL_SECONDS)
+
+def start_token_cleanup():
+    """Start the background thread that clears expired tokens, once per process"""
+    global _token_cleanup_started
+    with _token_cleanup_lock:
+        if _token_cleanup_started:
+            return
+        _token_cleanup_started = True
+    threading.Thread(target=_token_cleanup_loop, name='token-cleanup', daemon=True).start()
+
 def hash_password(password):
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with salted scrypt, stored as scrypt$n$r$p$salt$hash"""
+    salt = secrets.token_bytes(PASSWORD_SALT_BYTES)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+def verify_password(password, password_hash):
+    """Check a password against a stored scrypt hash, or a legacy unsalted SHA-256 hex digest"""
+    if not password_hash:
+        return False
+    if password_hash.startswith('scrypt$'):
+        _, n, r, p, salt, digest = password_hash.split('$')
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt),
+                                   n=int(n), r=int(r), p=int(p), dklen=len(digest) // 2)
+        return hmac.compare_digest(candidate.hex(), digest)
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+
+def password_needs_rehash(password_hash):
+    """True for hashes stored before scrypt or with weaker parameters"""
+    return not (password_hash or '').startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
 
 def generate_verification_code():
     """Generate a 6-digit verification code"""
-    return ''.join([str(secrets.randbelow(10)) for _ in range(6)])
+    # One urandom read covers all six digits; bytes of 250 and up are rejected so
+    # byte % 10 stays uniform (250 is the largest multiple of 10 below 256)
+    digits = []
+    while len(digits) < VERIFICATION_CODE_LENGTH:
+        digits.extend(str(b % 10) for b in secrets.token_bytes(16) if b < 250)
+    return ''.join(digits[:VERIFICATION_CODE_LENGTH])
 
 # Test function
 def test_auth_db():
@@ -1,69 +1,87 @@
+import os
 import re
+import hashlib
+import threading
+from collections import Counter, OrderedDict
 import numpy as np
+import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import string
 
 # Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
 try:
     nltk.data.find('corpora/stopwords')
 except LookupError:
     nltk.download('stopwords')
 
+# Built once; str.translate with a prebuilt table strips punctuation in a single C pass
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+STOP_WORDS = frozenset(stopwords.words('english'))
+# Fitted vectorizer and matrix, reused across restarts while the corpus and config are unchanged
+MODEL_CACHE_PATH = os.path.join(os.path.dirname(__file__), 'tfidf_model.joblib')
+# Part of the saved model's fingerprint; bump it when normalize_text/tokenize_text change behaviour
+MODEL_FORMAT_VERSION = 1
+
+# Similarity arrays kept for recently seen queries; cleared whenever the model is refitted
+SIMILARITY_CACHE_SIZE = 1024
+
+def normalize_text(text):
+    """Lowercase text and strip punctuation"""
+    return text.lower().translate(PUNCTUATION_TABLE)
+
+def tokenize_text(text):
+    """Split normalized text into tokens, dropping stopwords and short tokens"""
+    # With punctuation gone, whitespace splitting yields the same words as NLTK's
+    # word_tokenize without running its Punkt pipeline per call
+    return [token for token in text.split() if len(token) > 2 and token not in STOP_WORDS]
+
 class NLPProcessor:
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, model_path=MODEL_CACHE_PATH):
+        self.model_path = model_path
+        self.stop_words = STOP_WORDS
+        # Preprocessing runs inside the vectorizer, so fitting makes a single pass over the raw text
         self.vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words='english',
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            preprocessor=normalize_text,
+            tokenizer=tokenize_text,
+            token_pattern=None,
+            dtype=np.float32
         )
         self.documents = []
         self.tfidf_matrix = None
         self.is_fitted = False  # Track if model is fitted
+        self._similarity_cache = OrderedDict()
+        self._similarity_cache_lock = threading.Lock()
         
     def preprocess_text(self, text):
         """Clean and preprocess text"""
         if not text:
             return ""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and short tokens
-        tokens = [token for token in tokens if token not in self.stop_words and len(token) > 2]
-        
-        return ' '.join(tokens)
+        return ' '.join(tokenize_text(normalize_text(text)))
     
     def fit_documents(self, documents):
         """Fit TF-IDF vectorizer with documents"""
         try:
             self.documents = documents
-            processed_texts = []
-            
-            for doc in documents:
-                # Combine title, content, and keywords for better representation
-                combined_text = f"{doc['title']} {doc['content']} {doc.get('keywords', '')}"
-                processed_text = self.preprocess_text(combined_text)
-                processed_texts.append(processed_text)
+            # Combine title, content, and keywords for better representation
+            combined_texts = [f"{doc['title']} {doc['content']} {doc.get('keywords', '')}" for doc in documents]
             
-            if processed_texts:
-                self.tfidf_matrix = self.vectorizer.fit_transform(processed_texts)
+            if combined_texts:
+                fingerprint = self._fingerprint(combined_texts)
+                if self.load(self.model_path, fingerprint):
+                    print(f"TF-IDF model loaded from {self.model_path}")
+                else:
+                    # Column-major so a query only touches the columns of its own terms
+                    self.tfidf_matrix = self.vectorizer.fit_transform(combined_texts).tocsc()
+                    self.save(self.model_path, fingerprint)
+                    print(f"TF-IDF model fitted with {len(combined_texts)} documents")
+                with self._similarity_cache_lock:
+                    self._similarity_cache.clear()
                 self.is_fitted = True
-                print(f"TF-IDF model fitted with {len(processed_texts)} documents")
             else:
                 print("No documents to fit TF-IDF model")
                 self.is_fitted = False
@@ -72,6 +90,45 @@ class NLPProcessor:
             print(f"Error fitting documents: {e}")
             self.is_fitted = False
     
+    def _fingerprint(self, combined_texts):
+        """Hash of the corpus, the vectorizer settings and the model format"""
+        # Callables are named rather than repr'd, since their repr carries a per-process address
+        params = sorted((name, getattr(value, '__qualname__', value))
+                        for name, value in self.vectorizer.get_params().items())
+        config = f"{MODEL_FORMAT_VERSION}{params!r}"
+        return hashlib.sha256('\0'.join([config, *combined_texts]).encode()).hexdigest()
+    
+    def save(self, path, fingerprint):
+        """Write the fitted vectorizer and matrix to disk, tagged with the corpus fingerprint"""
+        # Write then rename so concurrent workers never read a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            joblib.dump((fingerprint, self.vectorizer, self.tfidf_matrix), tmp_path, compress=0)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not save TF-IDF model: {e}")
+            # Don't leave a partial temp file behind
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def load(self, path, fingerprint):
+        """Load a saved model if it was fitted on the same corpus; returns True on success"""
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            # mmap_mode lets the matrix arrays page in on demand instead of being read up front
+            saved_fingerprint, vectorizer, tfidf_matrix = joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            print(f"Could not load TF-IDF model: {e}")
+            return False
+        if saved_fingerprint != fingerprint:
+            return False
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = tfidf_matrix.tocsc()
+        return True
+    
     def semantic_search(self, query, documents, top_k=5):
         """Perform semantic search using TF-IDF and cosine similarity"""
         try:
@@ -98,18 +155,20 @@ class NLPProcessor:
             
             print(f"Processed query: '{processed_query}'")
             
-            # Transform query to TF-IDF vector
-            query_vector = self.vectorizer.transform([processed_query])
-            
-            # Calculate cosine similarity
-            similarities = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
+            similarities = self._query_similarities(processed_query)
             
             print(f"Similarities calculated, shape: {similarities.shape}")
             
             # Get top k most similar documents
             if len(similarities) > 0:
-                # Use numpy argsort with proper array handling
-                top_indices = np.argsort(similarities)[-top_k:][::-1]
+                if similarities.max() <= 0.001:
+                    print("No document passed the similarity threshold")
+                    return []
+                
+                # argpartition finds the top k in linear time; only those k get sorted
+                k = min(top_k, similarities.size)
+                top_indices = np.argpartition(similarities, -k)[-k:]
+                top_indices = top_indices[np.argsort(-similarities[top_indices])]
                 
                 results = []
                 for idx in top_indices:
@@ -133,6 +192,29 @@ class NLPProcessor:
             print(f"Traceback: {traceback.format_exc()}")
             return []
     
+    def _query_similarities(self, processed_query):
+        """Cosine similarity of every fitted document to a preprocessed query, cached per query"""
+        with self._similarity_cache_lock:
+            cached = self._similarity_cache.get(processed_query)
+            if cached is not None:
+                self._similarity_cache.move_to_end(processed_query)
+                return cached
+        
+        # Transform query to TF-IDF vector
+        query_vector = self.vectorizer.transform([processed_query])
+        
+        # TF-IDF rows and the query are already L2-normalized, so a dot product is the
+        # cosine similarity; only the columns of the query's few terms can contribute
+        similarities = self.tfidf_matrix[:, query_vector.indices] @ query_vector.data
+        # Shared between callers, so make sure nobody edits it in place
+        similarities.flags.writeable = False
+        
+        with self._similarity_cache_lock:
+            self._similarity_cache[processed_query] = similarities
+            if len(self._similarity_cache) > SIMILARITY_CACHE_SIZE:
+                self._similarity_cache.popitem(last=False)
+        return similarities
+    
     def extract_keywords(self, text, top_n=10):
         """Extract important keywords from text"""
         try:
@@ -140,7 +222,6 @@ class NLPProcessor:
             tokens = processed_text.split()
             
             # Simple frequency-based keyword extraction
-            from collections import Counter
             keywords = Counter(tokens)
             
             return [keyword for keyword, count in keywords.most_common(top_n)]